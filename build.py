@@ -1,15 +1,21 @@
 #!/usr/bin/env python3
 """Build script for creating PyInstaller binary."""
+import asyncio
 import os
 import platform
 import shutil
 import subprocess
+import sys
 import tomllib
 from datetime import date
 from pathlib import Path
 
 import PyInstaller.__main__
 
+from config.perfecto import CACHE_DIR_ENV_NAME
+from tools.help_manager import HelpManager, HELP_SNAPSHOT_FILE
+from tools.utils import close_http_clients
+
 sep = os.pathsep
 
 
@@ -65,6 +71,26 @@ VSVersionInfo(
         f.write(TEMPLATE.strip())
 
 
+def build_help_snapshot():
+    snapshot_path = Path('resources') / HELP_SNAPSHOT_FILE
+    # The help TOC and search index cached while creating the snapshot stay in the build directory, not in the
+    # cache directory of the user running the build
+    os.environ[CACHE_DIR_ENV_NAME] = str(Path('build') / 'help_cache')
+
+    async def create_snapshot() -> int:
+        try:
+            return await HelpManager.create_help_snapshot(snapshot_path)
+        finally:
+            await close_http_clients()
+
+    try:
+        pages = asyncio.run(create_snapshot())
+        print(f"Created {snapshot_path} with {pages} help pages")
+    except Exception as e:
+        # The binary still works without the snapshot, the help is downloaded on first use
+        print(f"Warning: help snapshot not created: {e}")
+
+
 def normalize_architecture(arch: str) -> str:
     if arch in ['x86_64', 'amd64']:
         return 'amd64'
@@ -211,4 +237,6 @@ def create_sha256_checksum(binary_name: str, dist_dir: Path):
 
 if __name__ == "__main__":
     build_version_file()
+    if "--no-help-snapshot" not in sys.argv:
+        build_help_snapshot()
     build()
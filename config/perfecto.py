@@ -7,6 +7,28 @@ SECURITY_TOKEN_FILE_ENV_NAME: str = "PERFECTO_SECURITY_TOKEN_FILE"
 SECURITY_TOKEN_ENV_NAME: str = "PERFECTO_SECURITY_TOKEN"
 PERFECTO_CLOUD_NAME_ENV_NAME: str = 'PERFECTO_CLOUD_NAME'
 
+CACHE_DIR_ENV_NAME: str = "PERFECTO_MCP_CACHE_DIR"
+HTTP_MAX_CONNECTIONS_ENV_NAME: str = "PERFECTO_MCP_HTTP_MAX_CONNECTIONS"
+HTTP_MAX_KEEPALIVE_CONNECTIONS_ENV_NAME: str = "PERFECTO_MCP_HTTP_MAX_KEEPALIVE_CONNECTIONS"
+HTTP_KEEPALIVE_EXPIRY_ENV_NAME: str = "PERFECTO_MCP_HTTP_KEEPALIVE_EXPIRY"
+EXECUTION_METADATA_TTL_ENV_NAME: str = "PERFECTO_MCP_EXECUTION_METADATA_TTL"
+AI_SCRIPTLESS_CATALOG_TTL_ENV_NAME: str = "PERFECTO_MCP_AI_SCRIPTLESS_CATALOG_TTL"
+HELP_CONCURRENCY_ENV_NAME: str = "PERFECTO_MCP_HELP_CONCURRENCY"
+HELP_PAGE_CACHE_SIZE_ENV_NAME: str = "PERFECTO_MCP_HELP_PAGE_CACHE_SIZE"
+EXECUTION_PAGE_CONCURRENCY_ENV_NAME: str = "PERFECTO_MCP_EXECUTION_PAGE_CONCURRENCY"
+EXECUTION_MAX_ITEMS_ENV_NAME: str = "PERFECTO_MCP_EXECUTION_MAX_ITEMS"
+EXECUTION_STORE_ENV_NAME: str = "PERFECTO_MCP_EXECUTION_STORE"
+EXECUTION_STORE_DAYS_ENV_NAME: str = "PERFECTO_MCP_EXECUTION_STORE_DAYS"
+EXECUTION_STORE_SYNC_INTERVAL_ENV_NAME: str = "PERFECTO_MCP_EXECUTION_STORE_SYNC_INTERVAL"
+EXECUTION_STORE_SYNC_MAX_ITEMS_ENV_NAME: str = "PERFECTO_MCP_EXECUTION_STORE_SYNC_MAX_ITEMS"
+EXECUTION_READ_CONCURRENCY_ENV_NAME: str = "PERFECTO_MCP_EXECUTION_READ_CONCURRENCY"
+EXECUTION_SUMMARY_CACHE_SIZE_ENV_NAME: str = "PERFECTO_MCP_EXECUTION_SUMMARY_CACHE_SIZE"
+POLL_MIN_INTERVAL_ENV_NAME: str = "PERFECTO_MCP_POLL_MIN_INTERVAL"
+POLL_MAX_INTERVAL_ENV_NAME: str = "PERFECTO_MCP_POLL_MAX_INTERVAL"
+AI_SCRIPTLESS_PARALLEL_ENV_NAME: str = "PERFECTO_MCP_AI_SCRIPTLESS_PARALLEL"
+REAL_DEVICE_INVENTORY_TTL_ENV_NAME: str = "PERFECTO_MCP_REAL_DEVICE_INVENTORY_TTL"
+REAL_DEVICE_READ_CONCURRENCY_ENV_NAME: str = "PERFECTO_MCP_REAL_DEVICE_READ_CONCURRENCY"
+
 SECURITY_TOKEN_NOT_SET_MESSAGE: str = f"Perfecto Security Token not set. Set environment variable {SECURITY_TOKEN_FILE_ENV_NAME} or {SECURITY_TOKEN_ENV_NAME}"
 PERFECTO_CLOUD_NAME_NOT_SET_MESSAGE: str = f"Perfecto Environment Cloud Name not set. Set environment variable {PERFECTO_CLOUD_NAME_ENV_NAME}"
 
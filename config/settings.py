@@ -0,0 +1,60 @@
+import os
+
+from config.perfecto import HTTP_MAX_CONNECTIONS_ENV_NAME, HTTP_MAX_KEEPALIVE_CONNECTIONS_ENV_NAME, \
+    HTTP_KEEPALIVE_EXPIRY_ENV_NAME, EXECUTION_METADATA_TTL_ENV_NAME, AI_SCRIPTLESS_CATALOG_TTL_ENV_NAME, \
+    HELP_CONCURRENCY_ENV_NAME, HELP_PAGE_CACHE_SIZE_ENV_NAME, EXECUTION_PAGE_CONCURRENCY_ENV_NAME, \
+    EXECUTION_MAX_ITEMS_ENV_NAME, EXECUTION_STORE_ENV_NAME, EXECUTION_STORE_DAYS_ENV_NAME, \
+    EXECUTION_STORE_SYNC_INTERVAL_ENV_NAME, EXECUTION_STORE_SYNC_MAX_ITEMS_ENV_NAME, \
+    EXECUTION_READ_CONCURRENCY_ENV_NAME, EXECUTION_SUMMARY_CACHE_SIZE_ENV_NAME, \
+    POLL_MIN_INTERVAL_ENV_NAME, POLL_MAX_INTERVAL_ENV_NAME, AI_SCRIPTLESS_PARALLEL_ENV_NAME, \
+    REAL_DEVICE_INVENTORY_TTL_ENV_NAME, REAL_DEVICE_READ_CONCURRENCY_ENV_NAME
+
+
+def get_env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def get_env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def get_env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ["1", "true", "yes", "on"]
+
+
+HTTP_MAX_CONNECTIONS: int = get_env_int(HTTP_MAX_CONNECTIONS_ENV_NAME, 20)
+HTTP_MAX_KEEPALIVE_CONNECTIONS: int = get_env_int(HTTP_MAX_KEEPALIVE_CONNECTIONS_ENV_NAME, 10)
+HTTP_KEEPALIVE_EXPIRY: float = get_env_float(HTTP_KEEPALIVE_EXPIRY_ENV_NAME, 60.0)
+EXECUTION_METADATA_TTL: float = get_env_float(EXECUTION_METADATA_TTL_ENV_NAME, 300.0)
+AI_SCRIPTLESS_CATALOG_TTL: float = get_env_float(AI_SCRIPTLESS_CATALOG_TTL_ENV_NAME, 120.0)
+HELP_CONCURRENCY: int = max(1, get_env_int(HELP_CONCURRENCY_ENV_NAME, 8))
+HELP_PAGE_CACHE_SIZE: int = get_env_int(HELP_PAGE_CACHE_SIZE_ENV_NAME, 16 * 1024 * 1024)
+EXECUTION_PAGE_CONCURRENCY: int = max(1, get_env_int(EXECUTION_PAGE_CONCURRENCY_ENV_NAME, 4))
+EXECUTION_MAX_ITEMS: int = max(1, get_env_int(EXECUTION_MAX_ITEMS_ENV_NAME, 1000))
+EXECUTION_STORE: bool = get_env_bool(EXECUTION_STORE_ENV_NAME, False)
+EXECUTION_STORE_DAYS: int = max(1, get_env_int(EXECUTION_STORE_DAYS_ENV_NAME, 30))
+EXECUTION_STORE_SYNC_INTERVAL: float = get_env_float(EXECUTION_STORE_SYNC_INTERVAL_ENV_NAME, 60.0)
+EXECUTION_STORE_SYNC_MAX_ITEMS: int = max(1, get_env_int(EXECUTION_STORE_SYNC_MAX_ITEMS_ENV_NAME, 100000))
+EXECUTION_READ_CONCURRENCY: int = max(1, get_env_int(EXECUTION_READ_CONCURRENCY_ENV_NAME, 8))
+EXECUTION_SUMMARY_CACHE_SIZE: int = get_env_int(EXECUTION_SUMMARY_CACHE_SIZE_ENV_NAME, 256 * 1024 * 1024)
+POLL_MIN_INTERVAL: float = max(0.5, get_env_float(POLL_MIN_INTERVAL_ENV_NAME, 2.0))
+POLL_MAX_INTERVAL: float = max(POLL_MIN_INTERVAL, get_env_float(POLL_MAX_INTERVAL_ENV_NAME, 30.0))
+AI_SCRIPTLESS_MAX_PARALLEL: int = 20
+AI_SCRIPTLESS_PARALLEL: int = min(AI_SCRIPTLESS_MAX_PARALLEL, max(1, get_env_int(AI_SCRIPTLESS_PARALLEL_ENV_NAME, 5)))
+REAL_DEVICE_INVENTORY_TTL: float = get_env_float(REAL_DEVICE_INVENTORY_TTL_ENV_NAME, 15.0)
+REAL_DEVICE_READ_CONCURRENCY: int = max(1, get_env_int(REAL_DEVICE_READ_CONCURRENCY_ENV_NAME, 8))
@@ -1,11 +1,12 @@
-from typing import List, Any, Optional
+from typing import Any, Optional
+
+from models.ai_scriptless import AiScriptlessCatalog, AiScriptlessTest
 
 
 def format_ai_scriptless_tests_filter_values(tests: dict[str, Any], params: Optional[dict] = None) -> dict[str, Any]:
-    filter_values = {
-        "test_name": [],
-        "owner_list": [],
-    }
+    # Dictionaries keep the insertion order and count the occurrences in a single pass
+    test_names = {}
+    owners = {}
 
     for item_visibility in tests["items"]:
         stack_tests = list(item_visibility.get("items", []))
@@ -14,46 +15,49 @@ def format_ai_scriptless_tests_filter_values(tests: dict[str, Any], params: Opti
             node_type = test["type"]
             if node_type == "SIMPLE":
                 test_name = test['name'].rstrip('.xml')
-                if test_name not in filter_values["test_name"]:
-                    filter_values["test_name"].append(test_name)
-                if test['createdBy'] not in filter_values["owner_list"]:
-                    filter_values["owner_list"].append(test['createdBy'])
-                if test['modifiedBy'] not in filter_values["owner_list"]:
-                    filter_values["owner_list"].append(test['modifiedBy'])
+                test_names[test_name] = test_names.get(test_name, 0) + 1
+                created_by = test['createdBy']
+                modified_by = test['modifiedBy']
+                owners[created_by] = owners.get(created_by, 0) + 1
+                if modified_by != created_by:
+                    owners[modified_by] = owners.get(modified_by, 0) + 1
             elif node_type == "CONTAINER":
                 stack_tests.extend(reversed(test.get("items", [])))
-    return filter_values
+
+    return {
+        "test_name": list(test_names),
+        "owner_list": list(owners),
+        "counts": {
+            "test_name": test_names,
+            "owner_list": owners,
+        }
+    }
 
 
-def format_ai_scriptless_tests(tests: dict[str, Any], params: Optional[dict] = None) -> List[dict[str, Any]]:
-    formatted_ai_scriptless_tests = []
-    filters = params.get("filters", {})
-    page_size = params["page_size"]
-    skip = params["skip"]
-    offset = skip + page_size
+def format_ai_scriptless_catalog(tests: dict[str, Any], params: Optional[dict] = None) -> AiScriptlessCatalog:
+    catalog = AiScriptlessCatalog()
 
     for item_visibility in tests["items"]:
         visibility = item_visibility["visibility"]
-        if "visibility" in filters and visibility != filters.get("visibility"):
-            continue
         stack_tests = list(item_visibility.get("items", []))
         while stack_tests:
             test = stack_tests.pop()
             node_type = test["type"]
             if node_type == "SIMPLE":
-                if "test_name" in filters and filters["test_name"].lower() not in test["name"].lower():
-                    continue
-                if "owner_list" in filters and test['createdBy'] not in filters.get('owner_list', []):
-                    continue
-                test_formatted = f"id:{test['key']} name:{test['name'].rstrip('.xml')} created[user:{test['createdBy']} date:{test['creationTime']['formatted']}] modified[user:{test['modifiedBy']} date:{test['modificationTime']['formatted']}]"
-                formatted_ai_scriptless_tests.append(test_formatted)
+                catalog.add(
+                    AiScriptlessTest(
+                        key=str(test["key"]),
+                        name=test["name"].rstrip(".xml"),
+                        visibility=visibility,
+                        created_by=test["createdBy"],
+                        creation_time=test["creationTime"]["formatted"],
+                        modified_by=test["modifiedBy"],
+                        modification_time=test["modificationTime"]["formatted"],
+                    ),
+                    raw_name=test["name"],
+                )
             elif node_type == "CONTAINER":
                 stack_tests.extend(reversed(test.get("items", [])))
 
-            if len(formatted_ai_scriptless_tests) > offset:
-                break
-
-    if len(formatted_ai_scriptless_tests) >= offset:
-        offset = len(formatted_ai_scriptless_tests) - 1
-
-    return formatted_ai_scriptless_tests[skip:offset]
+    catalog.filter_values = format_ai_scriptless_tests_filter_values(tests)
+    return catalog
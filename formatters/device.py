@@ -1,6 +1,6 @@
 from typing import List, Any, Optional
 
-from models.device import RealDevice, VirtualDevice
+from models.device import RealDevice, VirtualDevice, RealDeviceInventory
 
 
 def format_real_device(devices: dict[str, Any], params: Optional[dict] = None) -> List[RealDevice]:
@@ -26,6 +26,37 @@ def format_real_device(devices: dict[str, Any], params: Optional[dict] = None) -
     return formatted_devices
 
 
+# RealDevice fields (and the availability) of the compact device status table, with the device attribute of each one
+REAL_DEVICE_STATUS_COLUMNS = {
+    "device_id": "deviceId",
+    "platform_name": "os",
+    "platform_version": "osVersion",
+    "manufacturer": "manufacturer",
+    "model": "model",
+    "location": "location",
+    "status": "status",
+    "in_use": "inUse",
+    "available": "available",
+}
+# Key of the device in the device information, as the handset items of the device list
+REAL_DEVICE_KEY = "handset"
+
+
+def format_real_device_status(device: dict[str, Any], params: Optional[dict] = None) -> List[Any]:
+    """
+    Row of the compact device status table (REAL_DEVICE_STATUS_COLUMNS) from the device information.
+    """
+    handset = device.get(REAL_DEVICE_KEY) or {}
+    return [handset.get(attribute) for attribute in REAL_DEVICE_STATUS_COLUMNS.values()]
+
+
+def format_real_device_inventory(devices: dict[str, Any], params: Optional[dict] = None) -> RealDeviceInventory:
+    inventory = RealDeviceInventory()
+    for device in format_real_device(devices, params):
+        inventory.add(device)
+    return inventory
+
+
 def format_virtual_device(devices: dict[str, Any], params: Optional[dict] = None) -> List[VirtualDevice]:
     formatted_devices = []
 
@@ -1,7 +1,23 @@
 from typing import List, Any, Optional
 
 from models.execution import Execution, ExecutionPlatform
-from tools.utils import get_date_time_iso
+from tools.utils import get_date_time_iso, get_page_size
+
+# Key of the command list in the commands summary (and of the nested commands of a step)
+COMMAND_LIST_KEY = "commands"
+FAILED_COMMAND_STATUSES = ["FAILURE", "FAILED", "ERROR"]
+COMMAND_TEXT_SIZE = 300
+# Key of the execution list in the live executions search, each execution is identified by its id field (the one
+# used by the stop request)
+LIVE_EXECUTION_LIST_KEY = "items"
+# Key, in the metadata of the executions search, of the total of executions matching the search
+EXECUTIONS_TOTAL_KEY = "totalCount"
+
+
+def get_executions_total(executions: dict[str, Any]) -> Optional[int]:
+    # Total of executions matching the search, when the API reports it
+    total = (executions.get("metadata") or {}).get(EXECUTIONS_TOTAL_KEY)
+    return total if isinstance(total, int) else None
 
 
 def format_executions(executions: dict[str, Any], params: Optional[dict] = None) -> List[Execution]:
@@ -36,7 +52,9 @@ def format_executions(executions: dict[str, Any], params: Optional[dict] = None)
                     execution_id=item.get("testExecutionId"),
                     execution_url=execution_url,
                     start_time=get_date_time_iso(item.get("startTime", 0) / 1000),
+                    start_timestamp=item.get("startTime"),
                     end_time=get_date_time_iso(item.get("endTime", 0) / 1000),
+                    end_timestamp=item.get("endTime"),
                     status=item.get("status"),
                     job_id=item.get("job", {}).get("number", None),
                     job_name=item.get("job", {}).get("name", None),
@@ -48,3 +66,227 @@ def format_executions(executions: dict[str, Any], params: Optional[dict] = None)
                 )
             )
     return formatted_executions
+
+
+def _percentile(sorted_values: List[float], percent: float) -> Optional[float]:
+    # Linear interpolation between the closest ranks, like numpy.percentile
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * percent / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return round(sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower), 1)
+
+
+def _rate(count: int, total: int) -> Optional[float]:
+    return round(count * 100 / total, 1) if total else None
+
+
+def format_executions_analysis(executions: List[Execution], params: Optional[dict] = None) -> dict[str, Any]:
+    """
+    Compact summary of the executions: pass rates, status flips by test name, rollups by job and duration
+    percentiles (in seconds). The tables are returned as columns and rows to keep the result small.
+    """
+    top = params.get("top", 20)
+    tests = {}
+    jobs = {}
+    statuses = {}
+    durations = []
+
+    # Oldest first, to count the flips between consecutive runs of each test
+    for execution in sorted(executions, key=lambda e: e.start_timestamp or 0):
+        status = execution.status
+        statuses[status] = statuses.get(status, 0) + 1
+        duration = None
+        start_timestamp, end_timestamp = execution.start_timestamp, execution.end_timestamp
+        if start_timestamp and end_timestamp and end_timestamp >= start_timestamp:
+            duration = (end_timestamp - start_timestamp) / 1000
+            durations.append(duration)
+
+        test = tests.get(execution.test_name)
+        if test is None:
+            test = tests[execution.test_name] = {"runs": 0, "passed": 0, "failed": 0, "flips": 0,
+                                                 "last_status": None, "durations": []}
+        test["runs"] += 1
+        if status == "PASSED":
+            test["passed"] += 1
+        elif status == "FAILED":
+            test["failed"] += 1
+        if status in ["PASSED", "FAILED"]:
+            if test["last_status"] is not None and test["last_status"] != status:
+                test["flips"] += 1
+            test["last_status"] = status
+        if duration is not None:
+            test["durations"].append(duration)
+
+        job_key = (execution.job_name, execution.job_id)
+        if execution.job_name is not None:
+            job = jobs.get(job_key)
+            if job is None:
+                job = jobs[job_key] = {"runs": 0, "passed": 0, "failed": 0, "tests": set(), "durations": []}
+            job["runs"] += 1
+            if status == "PASSED":
+                job["passed"] += 1
+            elif status == "FAILED":
+                job["failed"] += 1
+            job["tests"].add(execution.test_name)
+            if duration is not None:
+                job["durations"].append(duration)
+
+    durations.sort()
+    # Flaky tests first, then the ones failing more
+    test_rows = []
+    for test_name, test in sorted(tests.items(), key=lambda t: (-t[1]["flips"], -t[1]["failed"], t[0]))[:top]:
+        test_durations = sorted(test["durations"])
+        test_rows.append([test_name, test["runs"], test["passed"], test["failed"],
+                          _rate(test["passed"], test["runs"]), test["flips"],
+                          _percentile(test_durations, 50), _percentile(test_durations, 90)])
+    job_rows = []
+    for (job_name, job_id), job in sorted(jobs.items(), key=lambda j: (-j[1]["failed"], -j[1]["runs"]))[:top]:
+        job_durations = sorted(job["durations"])
+        job_rows.append([job_name, job_id, job["runs"], len(job["tests"]), job["passed"], job["failed"],
+                         _rate(job["passed"], job["runs"]), _percentile(job_durations, 50),
+                         _percentile(job_durations, 90)])
+
+    return {
+        "summary": {
+            "executions": len(executions),
+            "tests": len(tests),
+            "statuses": statuses,
+            "pass_rate": _rate(statuses.get("PASSED", 0), len(executions)),
+            "flaky_tests": sum(1 for test in tests.values() if test["flips"] > 0),
+            "duration_p50": _percentile(durations, 50),
+            "duration_p90": _percentile(durations, 90),
+            "duration_p99": _percentile(durations, 99),
+        },
+        "tests": {
+            "columns": ["test_name", "runs", "passed", "failed", "pass_rate", "flips", "duration_p50",
+                        "duration_p90"],
+            "rows": test_rows,
+            "omitted": max(0, len(tests) - top),
+        },
+        "jobs": {
+            "columns": ["job_name", "job_id", "runs", "tests", "passed", "failed", "pass_rate", "duration_p50",
+                        "duration_p90"],
+            "rows": job_rows,
+            "omitted": max(0, len(jobs) - top),
+        },
+    }
+
+
+def _flatten_commands(commands: List[Any], level: int, flat_commands: List[tuple[int, dict[str, Any]]]):
+    # Depth first, the nested commands of a step follow the step with a deeper level
+    for command in commands:
+        if not isinstance(command, dict):
+            continue
+        flat_commands.append((level, command))
+        nested_commands = command.get(COMMAND_LIST_KEY)
+        if isinstance(nested_commands, list):
+            _flatten_commands(nested_commands, level + 1, flat_commands)
+
+
+def _shorten(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    text = value if isinstance(value, str) else str(value)
+    return text if len(text) <= COMMAND_TEXT_SIZE else text[:COMMAND_TEXT_SIZE] + "..."
+
+
+def _format_command_parameters(parameters: Any) -> Optional[str]:
+    if isinstance(parameters, list):
+        parameters = {p.get("name"): p.get("value") for p in parameters if isinstance(p, dict)} or None
+    if isinstance(parameters, dict):
+        return _shorten(", ".join(f"{name}={value}" for name, value in parameters.items()))
+    return _shorten(parameters)
+
+
+def _format_command_row(index: int, level: int, command: dict[str, Any]) -> List[Any]:
+    duration = command.get("duration")
+    start_time, end_time = command.get("startTime"), command.get("endTime")
+    if duration is None and isinstance(start_time, int) and isinstance(end_time, int) and end_time >= start_time:
+        duration = end_time - start_time
+    return [
+        index,
+        level,
+        command.get("name") or command.get("command"),
+        command.get("status"),
+        round(duration / 1000, 2) if isinstance(duration, (int, float)) else None,
+        _shorten(command.get("message") or command.get("errorMessage")),
+        _format_command_parameters(command.get("parameters")),
+    ]
+
+
+def _is_failed_command(command: dict[str, Any]) -> bool:
+    return str(command.get("status", "")).upper() in FAILED_COMMAND_STATUSES
+
+
+def format_command_summary(summary: Any, params: Optional[dict] = None) -> Optional[dict[str, Any]]:
+    """
+    Compact page of the commands of an execution summary, as columns and rows. The commands can be filtered by
+    status (commands='failed'), by the failure point (commands='around_failure', with `context` commands before
+    and after each failed command) and by name (command_name, case-insensitive substring).
+    None when the summary has no command list.
+    """
+    if not isinstance(summary, dict) or not isinstance(summary.get(COMMAND_LIST_KEY), list):
+        return None
+    # The tool args can be explicit nulls, they take the default too
+    mode = params.get("commands") or "all"
+    context = params.get("context")
+    context = 5 if context is None else max(0, context)
+    command_name = (params.get("command_name") or "").lower()
+    page_size = get_page_size(params)
+    page_index = max(1, params.get("page_index") or 1)
+
+    flat_commands = []
+    _flatten_commands(summary[COMMAND_LIST_KEY], 0, flat_commands)
+    failed_indexes = [index for index, (_, command) in enumerate(flat_commands) if _is_failed_command(command)]
+
+    if mode == "failed":
+        indexes = failed_indexes
+    elif mode == "around_failure":
+        around = set()
+        for failed_index in failed_indexes:
+            around.update(range(max(0, failed_index - context), min(len(flat_commands), failed_index + context + 1)))
+        indexes = sorted(around)
+    else:
+        indexes = range(len(flat_commands))
+    if command_name:
+        indexes = [index for index in indexes
+                   if command_name in str(flat_commands[index][1].get("name") or
+                                          flat_commands[index][1].get("command") or "").lower()]
+
+    skip = (page_index - 1) * page_size
+    # Only the rows of the page are formatted
+    rows = [_format_command_row(index, *flat_commands[index]) for index in indexes[skip:skip + page_size]]
+    execution = {key: value for key, value in summary.items() if isinstance(value, (str, int, float, bool))}
+    return {
+        "execution": execution,
+        "commands_count": len(flat_commands),
+        "failed_commands": len(failed_indexes),
+        "first_failed_index": failed_indexes[0] if failed_indexes else None,
+        "columns": ["index", "level", "name", "status", "duration", "message", "parameters"],
+        "rows": rows,
+        "count": len(rows),
+        "total": len(indexes),
+        "page": page_index,
+        "has_more": skip + page_size < len(indexes),
+    }
+
+
+def format_live_executions_snapshot(live_executions: Any,
+                                    params: Optional[dict] = None) -> Optional[dict[str, dict[str, Any]]]:
+    """
+    Live executions by execution id, with the fields compared between two snapshots.
+    None when the search result has no execution list.
+    """
+    if not isinstance(live_executions, dict) or not isinstance(live_executions.get(LIVE_EXECUTION_LIST_KEY), list):
+        return None
+    snapshot = {}
+    for item in live_executions[LIVE_EXECUTION_LIST_KEY]:
+        if not isinstance(item, dict) or item.get("id") is None:
+            continue
+        snapshot[str(item["id"])] = {
+            "name": item.get("name") or item.get("scriptName") or item.get("testName"),
+            "status": item.get("status"),
+        }
+    return snapshot
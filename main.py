@@ -11,7 +11,7 @@ from config.perfecto import SECURITY_TOKEN_FILE_ENV_NAME, SECURITY_TOKEN_ENV_NAM
     GITHUB
 from config.token import PerfectoToken, PerfectoTokenError
 from config.version import __version__, __executable__, __bundle__, __uvx__, get_version
-from server import register_tools
+from server import register_tools, server_lifespan
 
 PERFECTO_SECURITY_TOKEN_FILE_NAME = "perfecto-security-token.txt"
 PERFECTO_SECURITY_TOKEN_FILE_PATH = os.getenv(SECURITY_TOKEN_FILE_ENV_NAME)
@@ -71,7 +71,7 @@ def run(log_level: str = "CRITICAL"):
 """
 
     mcp = FastMCP("perfecto-mcp", instructions=instructions,
-                  log_level=cast(LOG_LEVELS, log_level))
+                  log_level=cast(LOG_LEVELS, log_level), lifespan=server_lifespan)
     register_tools(mcp, token)
     mcp.run(transport="stdio")
 
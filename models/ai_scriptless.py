@@ -0,0 +1,91 @@
+from bisect import bisect_right
+from heapq import merge
+from typing import List, Any, Optional
+
+from pydantic import BaseModel, Field
+
+
+class AiScriptlessTest(BaseModel):
+    key: str = Field(description="Unique identifier of the test")
+    name: str = Field(description="Name of the test")
+    visibility: str = Field(description="Visibility of the test (PUBLIC or PRIVATE)")
+    created_by: str = Field(description="User who created the test")
+    creation_time: str = Field(description="Creation date of the test")
+    modified_by: str = Field(description="User who modified the test")
+    modification_time: str = Field(description="Modification date of the test")
+
+    def summary(self) -> str:
+        return (f"id:{self.key} name:{self.name} created[user:{self.created_by} date:{self.creation_time}] "
+                f"modified[user:{self.modified_by} date:{self.modification_time}]")
+
+
+class AiScriptlessCatalog(BaseModel):
+    tests: List[AiScriptlessTest] = Field(description="All the tests flattened in tree order", default=[])
+    names: List[str] = Field(description="Lowercase raw name of each test, aligned with tests", default=[])
+    key_index: dict[str, int] = Field(description="Test position by key", default={})
+    owner_index: dict[str, List[int]] = Field(description="Test positions by creator or modifier", default={})
+    visibility_index: dict[str, List[int]] = Field(description="Test positions by visibility", default={})
+    filter_values: dict[str, Any] = Field(description="Values available for the list filters", default={})
+
+    def add(self, test: AiScriptlessTest, raw_name: str):
+        position = len(self.tests)
+        self.tests.append(test)
+        name = raw_name.lower()
+        self.names.append(name)
+        self.key_index[test.key] = position
+        self.visibility_index.setdefault(test.visibility, []).append(position)
+        self.owner_index.setdefault(test.created_by, []).append(position)
+        if test.modified_by != test.created_by:
+            self.owner_index.setdefault(test.modified_by, []).append(position)
+
+    def _candidates(self, filters: dict[str, Any]) -> Optional[List[int]]:
+        """
+        Positions (in tree order) matching the indexed filters, None when no indexed filter applies.
+        """
+        candidates = None
+        if "visibility" in filters:
+            candidates = self.visibility_index.get(filters["visibility"], [])
+        if "owner_list" in filters:
+            owner_lists = [self.owner_index.get(owner, []) for owner in dict.fromkeys(filters["owner_list"])]
+            # A test can be indexed for its creator and its modifier, drop the repeated positions
+            owner_positions = []
+            for position in merge(*owner_lists):
+                if not owner_positions or owner_positions[-1] != position:
+                    owner_positions.append(position)
+            if candidates is None:
+                candidates = owner_positions
+            else:
+                visibility_positions = set(candidates)
+                candidates = [position for position in owner_positions if position in visibility_positions]
+        return candidates
+
+    def search(self, filters: dict[str, Any], skip: int, page_size: int,
+               after: Optional[int] = None) -> tuple[List[AiScriptlessTest], bool]:
+        """
+        Return the requested page of tests matching the filters and whether there are more matching tests.
+        When after (a test position) is given, the page starts with the first matching test after it.
+        """
+        candidates = self._candidates(filters)
+        if candidates is None:
+            candidates = range(len(self.tests))
+        start = bisect_right(candidates, after) if after is not None else 0
+        test_name = filters.get("test_name")
+        if test_name is None:
+            start += skip
+            page = [self.tests[position] for position in candidates[start:start + page_size]]
+            return page, len(candidates) > start + page_size
+
+        # Name is a "contains" filter, scan only until the end of the requested page
+        test_name = test_name.lower()
+        page = []
+        matches = 0
+        for index in range(start, len(candidates)):
+            position = candidates[index]
+            if test_name not in self.names[position]:
+                continue
+            if matches >= skip + page_size:
+                return page, True
+            if matches >= skip:
+                page.append(self.tests[position])
+            matches += 1
+        return page, False
@@ -1,5 +1,11 @@
+from typing import List, Any
+
 from pydantic import BaseModel, Field
 
+# RealDevice fields indexed by the inventory, they can be used as query filters and facets
+REAL_DEVICE_INDEX_FIELDS = ["platform_name", "platform_version", "manufacturer", "model", "location", "status",
+                            "in_use"]
+
 
 class RealDevice(BaseModel):
     device_id: str = Field(description="Unique identifier of the device (capability=deviceName)")
@@ -13,6 +19,51 @@ class RealDevice(BaseModel):
     status: str = Field(description="The Device Status")
     in_use: str = Field(description="Whether the device is in use")
 
+
+class RealDeviceInventory(BaseModel):
+    devices: List[RealDevice] = Field(description="All the available real devices", default=[])
+    index: dict[str, dict[str, List[int]]] = Field(
+        description="Device positions by indexed field and lowercase value", default={})
+
+    def add(self, device: RealDevice):
+        position = len(self.devices)
+        self.devices.append(device)
+        for field in REAL_DEVICE_INDEX_FIELDS:
+            value = str(getattr(device, field)).lower()
+            self.index.setdefault(field, {}).setdefault(value, []).append(position)
+
+    def query(self, filters: dict[str, Any]) -> List[int]:
+        """
+        Positions of the devices matching all the filters, each filter is a value or a list of accepted values
+        of an indexed field (case-insensitive).
+        """
+        positions = None
+        for field in REAL_DEVICE_INDEX_FIELDS:
+            if field not in filters:
+                continue
+            values = filters[field] if isinstance(filters[field], list) else [filters[field]]
+            field_positions = set()
+            for value in values:
+                field_positions.update(self.index.get(field, {}).get(str(value).lower(), []))
+            positions = field_positions if positions is None else positions & field_positions
+            if not positions:
+                return []
+        return sorted(positions) if positions is not None else list(range(len(self.devices)))
+
+    def facets(self, positions: List[int]) -> dict[str, dict[str, int]]:
+        """
+        Number of devices by value of each indexed field, over the given devices.
+        """
+        facets = {}
+        for field in REAL_DEVICE_INDEX_FIELDS:
+            counts = {}
+            for position in positions:
+                value = getattr(self.devices[position], field)
+                counts[value] = counts.get(value, 0) + 1
+            facets[field] = dict(sorted(counts.items(), key=lambda count: (-count[1], str(count[0]))))
+        return facets
+
+
 class VirtualDevice(BaseModel):
     platform_name: str = Field(description="The Platform Name (capability=platformName)")
     platform_version: list[str] = Field(description="The Platform Version (capability=platformVersion)")
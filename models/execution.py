@@ -18,7 +18,11 @@ class Execution(BaseModel):
     execution_id: str = Field(description="Unique identifier of the execution")
     execution_url: str = Field(description="URL of the report")
     start_time: str = Field(description="Start time of the test")
+    start_timestamp: Optional[int] = Field(description="Start time of the test in milliseconds since epoch",
+                                           default=None, exclude=True)
     end_time: str = Field(description="End time of the test")
+    end_timestamp: Optional[int] = Field(description="End time of the test in milliseconds since epoch",
+                                         default=None, exclude=True)
     status: str = Field(description="Execution status")
     job_id: Optional[int] = Field(description="Unique identifier of the job", default=None)
     job_name: Optional[str] = Field(description="Name of the job", default=None)
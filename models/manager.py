@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Literal
 
 from mcp.server.fastmcp import Context
 
@@ -9,3 +9,17 @@ class Manager:
     def __init__(self, token: Optional[PerfectoToken], ctx: Context):
         self.token = token
         self.ctx = ctx
+
+    async def report_progress(self, progress: float, total: Optional[float] = None, message: Optional[str] = None):
+        """
+        Notify the progress of a long operation to the MCP client, when the tool was called with a context.
+        """
+        if self.ctx is not None:
+            await self.ctx.report_progress(progress, total, message)
+
+    async def notify(self, message: str, level: Literal["debug", "info", "warning", "error"] = "info"):
+        """
+        Push a log notification to the MCP client while the tool is running, when the tool was called with a context.
+        """
+        if self.ctx is not None:
+            await self.ctx.log(level, message)
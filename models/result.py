@@ -25,6 +25,13 @@ class BaseResult(BaseModel):
     def model_dump_json(self, **kwargs):
         return super().model_dump_json(exclude_none=True, **kwargs)
 
+
+class ConditionalResult(BaseResult):
+    not_modified: bool = Field(description="The resource was not modified since the validators", default=False)
+    etag: Optional[str] = Field(description="ETag validator of the resource", default=None)
+    last_modified: Optional[str] = Field(description="Last-Modified validator of the resource", default=None)
+
+
 class PaginationResult(BaseResult):
     items: List[Any] = Field(description="Items", default=[])
     count: int = Field(description="Number of Items", default=0)
@@ -33,3 +40,4 @@ class PaginationResult(BaseResult):
     offset: int = Field(description="Offset index", default=0)
     next_offset: int = Field(description="Next Offset index", default=0)
     has_more: bool = Field(description="Has More", default=0)
+    cursor: Optional[str] = Field(description="Opaque cursor to read the next page", default=None)
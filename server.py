@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from typing import Optional
 
 from config.token import PerfectoToken
@@ -6,6 +7,7 @@ from tools.device_manager import register as register_device_manager
 from tools.execution_manager import register as register_execution_manager
 from tools.help_manager import register as register_help_manager
 from tools.user_manager import register as register_user_manager
+from tools.utils import close_http_clients
 
 
 def register_tools(mcp, token: Optional[PerfectoToken]):
@@ -21,3 +23,17 @@ def register_tools(mcp, token: Optional[PerfectoToken]):
     register_execution_manager(mcp, token)
     register_help_manager(mcp, token)
     register_ai_scriptless_manager(mcp, token)
+
+
+@asynccontextmanager
+async def server_lifespan(mcp):
+    """
+    MCP server lifespan, release the shared resources (pooled HTTP connections) on shutdown.
+
+    Args:
+        mcp: The MCP server instance
+    """
+    try:
+        yield
+    finally:
+        await close_http_clients()
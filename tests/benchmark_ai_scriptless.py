@@ -0,0 +1,90 @@
+"""
+Benchmark of the AI Scriptless filter values extraction on synthetic test trees.
+
+    python tests/benchmark_ai_scriptless.py [--baseline REV] [--sizes N,N,...]
+
+Each tree has the given number of test nodes in nested folders of the PUBLIC and PRIVATE visibilities, with mostly
+distinct test names and a few hundred owners. With --baseline, the formatters/ai_scriptless.py module of the given
+git revision is benchmarked too and its test names and owners must match the current ones.
+"""
+import argparse
+import importlib.util
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_PATH = Path(__file__).parent.parent
+
+sys.path.insert(0, str(ROOT_PATH))
+
+
+def load_formatter(revision=None):
+    if revision is None:
+        from formatters import ai_scriptless
+        return ai_scriptless
+    source = subprocess.run(["git", "show", f"{revision}:formatters/ai_scriptless.py"], cwd=ROOT_PATH, check=True,
+                            capture_output=True, text=True).stdout
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as module_file:
+        module_file.write(source)
+    spec = importlib.util.spec_from_file_location(f"ai_scriptless_{revision}", module_file.name)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    os.unlink(module_file.name)
+    return module
+
+
+def build_tree(tests):
+    # Same shape as the /scripts/tree answer: visibilities with nested CONTAINER folders of SIMPLE tests
+    rand = random.Random(tests)
+    owners = [f"user{i}@example.com" for i in range(max(1, tests // 200))]
+    visibilities = {"PUBLIC": [], "PRIVATE": []}
+    for i in range(tests):
+        created_by = rand.choice(owners)
+        test = {
+            "type": "SIMPLE",
+            "key": str(i),
+            "name": f"Test {rand.randint(0, tests)}.xml",
+            "createdBy": created_by,
+            "modifiedBy": created_by if rand.random() < 0.7 else rand.choice(owners),
+            "creationTime": {"formatted": "2025-01-01 10:00"},
+            "modificationTime": {"formatted": "2025-01-02 10:00"},
+        }
+        folders = visibilities["PUBLIC" if i % 3 else "PRIVATE"]
+        if not folders or len(folders[-1]["items"]) >= 50:
+            folders.append({"type": "CONTAINER", "name": f"Folder {i}", "items": []})
+        folders[-1]["items"].append(test)
+    return {"items": [{"visibility": visibility, "items": folders} for visibility, folders in visibilities.items()]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark format_ai_scriptless_tests_filter_values")
+    parser.add_argument("--baseline", help="git revision to compare with, e.g. HEAD~1")
+    parser.add_argument("--sizes", default="5000,20000,50000", help="test nodes of each synthetic tree")
+    args = parser.parse_args()
+
+    modules = [("current", load_formatter())]
+    if args.baseline:
+        modules.insert(0, (args.baseline, load_formatter(args.baseline)))
+    differ = False
+    for size in [int(size) for size in args.sizes.split(",")]:
+        tree = build_tree(size)
+        print(f"{size} tests")
+        expected = None
+        for name, module in modules:
+            start = time.perf_counter()
+            filter_values = module.format_ai_scriptless_tests_filter_values(tree)
+            print(f"{name:>12}: {(time.perf_counter() - start) * 1000:10.1f} ms")
+            output = (filter_values["test_name"], filter_values["owner_list"])
+            if expected is None:
+                expected = output
+            differ = differ or output != expected
+    if differ:
+        sys.exit("the outputs differ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark of list_report_executions with the time frame split in day shards against a single search.
+
+    python tests/benchmark_execution_shards.py [--executions N] [--days N] [--pages N,N,...]
+                                               [--latency SECONDS] [--scan-cost SECONDS]
+
+The reporting API is simulated by a mock transport: each search answers after the latency plus scan-cost by
+execution skipped or returned (the cost of a deep skip), with the total in its metadata. Each page is read with
+time_shard none and day, on a cold shard count cache and on a warm one, and the sharded pages must match the
+single search ones.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.token import PerfectoToken  # noqa: E402
+from tools import utils  # noqa: E402
+from tools.execution_manager import ExecutionManager  # noqa: E402
+
+
+class MockReportingApi:
+    def __init__(self, executions: int, days: int, latency: float, scan_cost: float):
+        now = int(time.time() * 1000)
+        span = days * 24 * 60 * 60 * 1000
+        self.latency = latency
+        self.scan_cost = scan_cost
+        self.requests = 0
+        # Newest first, like the searches sorted by start time
+        self.executions = [{"id": f"t{i}", "name": f"test{i % 7}", "testExecutionId": f"e{i}",
+                            "startTime": now - int(i * span / executions) - 1, "endTime": now, "status": "PASSED",
+                            "platforms": [], "job": {}, "tags": []} for i in range(executions)]
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        body = json.loads(request.content)
+        fields = body["filter"]["fields"]
+        start_time = fields["startExecutionTime"][0]
+        end_time = fields.get("endExecutionTime", [float("inf")])[0]
+        skip, page_size = body["skip"], body["pageSize"]
+        await asyncio.sleep(self.latency + self.scan_cost * (skip + page_size))
+        matching = [execution for execution in self.executions if start_time <= execution["startTime"] <= end_time]
+        return httpx.Response(200, json={"items": matching[skip:skip + page_size],
+                                         "metadata": {"totalCount": len(matching)}})
+
+
+async def read_page(api: MockReportingApi, page_index: int, time_shard: str) -> tuple[list[str], float, int]:
+    manager = ExecutionManager(PerfectoToken("token", "cloud"), None)
+    api.requests = 0
+    start = time.perf_counter()
+    executions = await manager.list_report_executions({"time_frame": "lastMonth", "page_index": page_index,
+                                                       "time_shard": time_shard})
+    elapsed = time.perf_counter() - start
+    if executions.error is not None:
+        sys.exit(f"page {page_index} with time_shard {time_shard} failed: {executions.error}")
+    return [execution.test_id for execution in executions.result.items], elapsed, api.requests
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the day shards of list_report_executions")
+    parser.add_argument("--executions", type=int, default=20000, help="executions of the time frame")
+    parser.add_argument("--days", type=int, default=30, help="days the executions are spread over")
+    parser.add_argument("--pages", default="1,20,100,300", help="page indexes (of 50 executions) to read")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds of each search request")
+    parser.add_argument("--scan-cost", type=float, default=0.00002,
+                        help="seconds of each execution skipped or returned by a search")
+    args = parser.parse_args()
+
+    api = MockReportingApi(args.executions, args.days, args.latency, args.scan_cost)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(api.handle))
+    utils.get_http_client = lambda endpoint: client
+    print(f"{args.executions} executions over {args.days} days")
+    differ = False
+    for page_index in [int(page) for page in args.pages.split(",")]:
+        single, single_time, single_requests = await read_page(api, page_index, "none")
+        ExecutionManager.shard_total_cache.invalidate()
+        cold, cold_time, cold_requests = await read_page(api, page_index, "day")
+        warm, warm_time, warm_requests = await read_page(api, page_index, "day")
+        print(f"page {page_index:>4}: single {single_time * 1000:8.1f} ms {single_requests:>3} requests  "
+              f"shards cold {cold_time * 1000:8.1f} ms {cold_requests:>3} requests  "
+              f"warm {warm_time * 1000:8.1f} ms {warm_requests:>3} requests")
+        differ = differ or cold != single or warm != single
+    await client.aclose()
+    if differ:
+        sys.exit("the outputs differ")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
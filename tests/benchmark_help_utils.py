@@ -0,0 +1,132 @@
+"""
+Benchmark of the help page conversion and of the help TOC javascript parsing.
+
+    python tests/benchmark_help_utils.py [--baseline REV] [--repeat N] [--size N]
+
+The page is built by repeating the main content of the tests/help_pages corpus, the TOC chunks are synthetic
+chunks of --size * 30 pages, with and without escaped apostrophes in the titles. With --baseline, the help_utils
+module of the given git revision is benchmarked too and its output must match the current one, except on the TOC
+chunk with escaped apostrophes (the help_utils before the tokenizer decoded them as double quotes).
+"""
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT_PATH = Path(__file__).parent.parent
+HELP_PAGES_PATH = Path(__file__).parent / "help_pages"
+HELP_PAGE_URL = "https://help.perfecto.io/perfecto-help/content/perfecto/test-automation/page.htm"
+
+sys.path.insert(0, str(ROOT_PATH))
+
+
+def load_help_utils(revision=None):
+    if revision is None:
+        from tools import help_utils
+        return help_utils
+    source = subprocess.run(["git", "show", f"{revision}:tools/help_utils.py"], cwd=ROOT_PATH, check=True,
+                            capture_output=True, text=True).stdout
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as module_file:
+        module_file.write(source)
+    spec = importlib.util.spec_from_file_location(f"help_utils_{revision}", module_file.name)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    os.unlink(module_file.name)
+    return module
+
+
+def build_page(size):
+    from lxml import etree
+    contents = []
+    for page in sorted(HELP_PAGES_PATH.glob("*.html")):
+        main = etree.HTML(page.read_text(encoding="utf-8")).xpath('//div[@role="main"] | //main')
+        if main:
+            contents.append("".join(etree.tostring(child, encoding="unicode") for child in main[0]))
+    body = "".join(contents[i % len(contents)] for i in range(size))
+    return f'<html><body><div role="main">{body}</div></body></html>'
+
+
+def build_toc_chunk(pages, apostrophes=True):
+    # Same shape as the chunks of the help TOC: url -> ids, titles and bookmarks
+    rand = random.Random(pages)
+    words = ["Perfecto", "Appium", "Selenium", "device", "test's", "run", "Don't", "grid", "report", "CI", "a&b"]
+    if not apostrophes:
+        words = [word.replace("'", "") for word in words]
+    items = []
+    for i in range(pages):
+        path = "/".join(rand.choice(["automation-testing", "integrations", "manual", "admin"])
+                        for _ in range(rand.randint(1, 2)))
+        count = rand.randint(1, 3)
+        ids = ",".join(str(rand.randint(0, 9999)) for _ in range(count))
+        titles = ",".join("'" + " ".join(rand.choice(words) for _ in range(rand.randint(2, 6))).replace("'", "\\'")
+                          + "'" for _ in range(count))
+        bookmarks = ",".join("''" for _ in range(count))
+        items.append(f"'/content/perfecto/{path}/page_{i}.htm':{{i:[{ids}],t:[{titles}],b:[{bookmarks}]}}")
+    return "define({" + ",".join(items) + "});"
+
+
+def benchmark(function, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(data)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, statistics.median(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark html_to_markdown and convert_js_to_py_dict")
+    parser.add_argument("--baseline", help="git revision to compare with, e.g. HEAD~1")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--size", type=int, default=200, help="corpus pages repeated in the benchmark page")
+    args = parser.parse_args()
+
+    modules = [("current", load_help_utils())]
+    if args.baseline:
+        modules.insert(0, (args.baseline, load_help_utils(args.baseline)))
+    html = build_page(args.size)
+    toc_chunk = build_toc_chunk(args.size * 30, apostrophes=False)
+    escaped_toc_chunk = build_toc_chunk(args.size * 30)
+    # Title, function of the module, input and whether the baseline output is compared
+    benchmarks = [
+        (f"html_to_markdown, {len(html) / 1024:.0f} KB page",
+         lambda module: lambda data: module.html_to_markdown(data, HELP_PAGE_URL), html, True),
+        (f"convert_js_to_py_dict, {len(toc_chunk) / 1024:.0f} KB TOC chunk",
+         lambda module: module.convert_js_to_py_dict, toc_chunk, True),
+        (f"convert_js_to_py_dict, {len(escaped_toc_chunk) / 1024:.0f} KB TOC chunk with escaped apostrophes",
+         lambda module: module.convert_js_to_py_dict, escaped_toc_chunk, False),
+    ]
+    differ = False
+    for title, get_function, data, compare_baseline in benchmarks:
+        print(title)
+        outputs = []
+        for name, module in modules:
+            gc.collect()
+            output, median, peak = benchmark(get_function(module), data, args.repeat)
+            print(f"{name:>12}: {median * 1000:8.1f} ms  peak {peak / 1024 / 1024:6.1f} MB")
+            # Kept as a string, a large parsed output would slow down the garbage collections of the next runs
+            outputs.append(json.dumps(output, sort_keys=True))
+        if len(outputs) > 1 and not compare_baseline:
+            print(f"{'':>12}  output not compared with the baseline")
+        elif len(outputs) > 1 and outputs[0] != outputs[-1]:
+            print(f"{'':>12}  the outputs differ")
+            differ = True
+    if differ:
+        sys.exit("the outputs differ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark of the per-call latency of http_request with the pooled client against a client created by call.
+
+    python tests/benchmark_http_client.py [--calls N] [--url URL]
+
+Without --url a local keep-alive HTTP/1.1 server is started, so the saving measured is only the TCP connection and
+the client setup. Against a real host (--url https://...) the DNS lookup and the TLS handshake are saved too.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools import utils  # noqa: E402
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body in one segment, otherwise the delayed ACKs add 40 ms to each keep-alive request
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = b'{"status": "ok"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server() -> str:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+async def request_with_new_client(url: str):
+    # The request of http_request before the pooled clients: one client (and connection) by call
+    async with httpx.AsyncClient(base_url="", http2=True, timeout=utils.timeout) as client:
+        resp = await client.request("GET", url, headers={"User-Agent": utils.user_agent})
+        resp.raise_for_status()
+        return resp.text
+
+
+async def request_with_pooled_client(url: str):
+    result = await utils.http_request("GET", endpoint=url)
+    return result.result
+
+
+async def benchmark(request, url: str, calls: int) -> list[float]:
+    # Sequential calls, like the repeated tool calls of a session
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await request(url)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pooled HTTP client of http_request")
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--url", help="URL to request instead of the local server")
+    args = parser.parse_args()
+
+    url = args.url or start_server()
+    print(f"{args.calls} sequential GET {url}")
+    try:
+        for name, request in [("client by call", request_with_new_client), ("pooled client", request_with_pooled_client)]:
+            await request(url)
+            timings = await benchmark(request, url, args.calls)
+            print(f"{name:>15}: median {statistics.median(timings) * 1000:7.2f} ms  "
+                  f"p95 {sorted(timings)[int(len(timings) * 0.95)] * 1000:7.2f} ms")
+    finally:
+        await utils.close_http_clients()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
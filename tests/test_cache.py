@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from tools.cache import TTLCache
+
+
+def test_ttl_cache_shares_loads():
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return len(loads)
+
+    async def main():
+        cache = TTLCache(ttl=60)
+        return await asyncio.gather(cache.get("key", loader), cache.get("key", loader))
+
+    assert asyncio.run(main()) == [1, 1]
+
+
+def test_ttl_cache_cancelled_load_is_retried():
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        await asyncio.sleep(0.05)
+        return len(loads)
+
+    async def main():
+        cache = TTLCache(ttl=60)
+        first = asyncio.create_task(cache.get("key", loader))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(cache.get("key", loader))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == 2
+
+
+def test_ttl_cache_cancelled_waiter_keeps_load():
+    async def loader():
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def main():
+        cache = TTLCache(ttl=60)
+        first = asyncio.create_task(cache.get("key", loader))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(cache.get("key", loader))
+        await asyncio.sleep(0.01)
+        second.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await second
+        return await first
+
+    assert asyncio.run(main()) == "value"
@@ -0,0 +1,40 @@
+from formatters.execution import format_command_summary, format_live_executions_snapshot, get_executions_total
+
+
+def test_command_summary_page():
+    summary = {
+        "status": "FAILED",
+        "commands": [
+            {"name": "open", "status": "SUCCESS", "startTime": 0, "endTime": 1500},
+            {"name": "login", "status": "FAILURE", "message": "not found", "commands": [
+                {"name": "click", "status": "FAILURE", "parameters": [{"name": "id", "value": "ok"}]},
+            ]},
+            {"name": "close", "status": "SUCCESS"},
+        ],
+    }
+    page = format_command_summary(summary, {"commands": "failed"})
+    assert page["execution"] == {"status": "FAILED"}
+    assert page["commands_count"] == 4
+    assert page["rows"] == [[1, 0, "login", "FAILURE", None, "not found", None],
+                            [2, 1, "click", "FAILURE", None, None, "id=ok"]]
+    assert format_command_summary(summary, {"command_name": "OPEN"})["rows"][0][4] == 1.5
+    nulls = {"commands": None, "context": None, "command_name": None, "page_size": None, "page_index": None}
+    assert format_command_summary(summary, nulls)["rows"] == format_command_summary(summary, {})["rows"]
+
+
+def test_command_summary_without_command_list():
+    assert format_command_summary({"status": "PASSED", "items": []}, {}) is None
+    assert format_command_summary([], {}) is None
+
+
+def test_live_executions_snapshot():
+    live_executions = {"items": [{"id": "1", "name": "login", "status": "RUNNING"}, {"executionId": "2"}]}
+    assert format_live_executions_snapshot(live_executions) == {"1": {"name": "login", "status": "RUNNING"}}
+    assert format_live_executions_snapshot({"items": []}) == {}
+    assert format_live_executions_snapshot({"executions": []}) is None
+
+
+def test_executions_total():
+    assert get_executions_total({"items": [], "metadata": {"totalCount": 42}}) == 42
+    assert get_executions_total({"items": [], "metadata": None}) is None
+    assert get_executions_total({"items": [], "total": 42}) is None
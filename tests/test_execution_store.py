@@ -0,0 +1,50 @@
+import sqlite3
+
+from models.execution import Execution
+from tools.execution_store import ExecutionStore
+
+TERMINAL_STATUSES = ["PASSED", "FAILED", "BLOCKED"]
+
+
+def create_execution(test_id: str, start_timestamp: int, end_timestamp=None, status="PASSED") -> Execution:
+    return Execution(test_id=test_id, test_name="test", execution_id=f"e{test_id}", execution_url="", start_time="",
+                     start_timestamp=start_timestamp, end_time="", end_timestamp=end_timestamp, status=status,
+                     tags=[], platforms=[], failure_reason={}, error_analysis={})
+
+
+def test_oldest_running(tmp_path):
+    store = ExecutionStore(tmp_path / "executions.db")
+    store.save("cloud", [create_execution("1", 100, 150), create_execution("2", 200, status="RUNNING"),
+                         create_execution("3", 300, status="RUNNING"), create_execution("4", 400, status="UNKNOWN")],
+               0, 0, 400)
+    assert store.get_oldest_running("cloud", TERMINAL_STATUSES, 0) == 200
+    store.save("cloud", [create_execution("2", 200, 250, "FAILED")], 0, 0, 400)
+    assert store.get_oldest_running("cloud", TERMINAL_STATUSES, 0) == 300
+    # A stale execution without end time doesn't pull the oldest running back beyond since
+    assert store.get_oldest_running("cloud", TERMINAL_STATUSES, 350) == 400
+    # The end time 0 reported for the executions not finished is stored as no end time
+    store.save("cloud", [create_execution("3", 300, 0, "RUNNING")], 0, 0, 400)
+    assert store.get_oldest_running("cloud", TERMINAL_STATUSES, 0) == 300
+    assert store.search("cloud", {"filter": {"fields": {}}}, 0, 10)[0][1].end_timestamp is None
+
+
+def test_save_keeps_history(tmp_path):
+    store = ExecutionStore(tmp_path / "executions.db")
+    store.save("cloud", [create_execution("1", 100, 150), create_execution("2", 200, 250)], 50, 50, 200)
+    store.save("cloud", [create_execution("3", 900, 950)], 50, 800, 900)
+    assert store.search("cloud", {"filter": {"fields": {}}}, 0, 10)[1] == 3
+    assert store.get_sync_state("cloud")["complete_since"] == 800
+    store.save("cloud", [], 150, 150, 900)
+    assert [execution.test_id for execution in store.search("cloud", {"filter": {"fields": {}}}, 0, 10)[0]] == \
+        ["3", "2"]
+
+
+def test_sync_state_migration(tmp_path):
+    path = tmp_path / "executions.db"
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE sync_state (cloud TEXT PRIMARY KEY, coverage_start INTEGER NOT NULL, "
+                           "watermark INTEGER NOT NULL, synced_at INTEGER NOT NULL)")
+        connection.execute("INSERT INTO sync_state VALUES ('cloud', 100, 200, 300)")
+    connection.close()
+    assert ExecutionStore(path).get_sync_state("cloud") == {"coverage_start": 100, "complete_since": 100,
+                                                            "watermark": 200, "synced_at": 300}
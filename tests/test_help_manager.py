@@ -0,0 +1,45 @@
+import asyncio
+
+from models.result import ConditionalResult
+from tools import help_manager
+from tools.help_manager import HelpManager
+
+HELP_URL = "https://help.perfecto.io/perfecto-help/content/perfecto/page.htm"
+
+
+def format_page(html, params=None):
+    return {"help_content": html.upper()}
+
+
+def test_read_help_page_evicted_during_revalidation(monkeypatch):
+    requests = []
+
+    async def conditional_request(endpoint, etag=None, last_modified=None):
+        requests.append((etag, last_modified))
+        # Another page evicts this one while the request is running
+        HelpManager.help_page_cache.invalidate((HELP_URL, format_page.__name__))
+        return ConditionalResult(not_modified=True, etag=etag, last_modified=last_modified)
+
+    monkeypatch.setattr(help_manager, "http_conditional_request", conditional_request)
+    page = {"etag": '"v1"', "last_modified": None, "content_hash": "hash", "result": {"help_content": "PAGE"}}
+    HelpManager._put_help_page((HELP_URL, format_page.__name__), page)
+
+    result = asyncio.run(HelpManager._read_help_page(HELP_URL, format_page, use_snapshot=False))
+    assert result.result == {"help_content": "PAGE"}
+    assert requests == [('"v1"', None)]
+    assert HelpManager.help_page_cache.peek((HELP_URL, format_page.__name__)) == page
+
+
+def test_read_help_page_without_cached_entry_sends_no_validators(monkeypatch):
+    requests = []
+
+    async def conditional_request(endpoint, etag=None, last_modified=None):
+        requests.append((etag, last_modified))
+        return ConditionalResult(result="page", etag='"v2"')
+
+    monkeypatch.setattr(help_manager, "http_conditional_request", conditional_request)
+    HelpManager.help_page_cache.invalidate((HELP_URL, format_page.__name__))
+
+    result = asyncio.run(HelpManager._read_help_page(HELP_URL, format_page, use_snapshot=False))
+    assert result.result == {"help_content": "PAGE"}
+    assert requests == [(None, None)]
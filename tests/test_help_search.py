@@ -0,0 +1,55 @@
+from tools.help_search import HelpSearchIndex, EXCERPT_SIZE
+
+
+def create_index() -> HelpSearchIndex:
+    search_index = HelpSearchIndex()
+    search_index.set_titles([
+        ("perfecto:self:appium", "perfecto", "self", "appium", "Appium capabilities"),
+        ("perfecto:self:selenium", "perfecto", "self", "selenium", "Selenium grid"),
+    ])
+    search_index.set_body("perfecto:self:appium", "Set the securityToken capability. " + "filler " * 500)
+    return search_index
+
+
+def test_body_is_not_stored():
+    search_index = create_index()
+    document = search_index.documents["perfecto:self:appium"]
+    assert "body" not in document
+    assert len(document["excerpt"]) == EXCERPT_SIZE
+    assert search_index.search("securitytoken", 5)[0]["help_id"] == "appium"
+
+
+def test_snippet_from_full_body():
+    search_index = create_index()
+    body = "filler " * 500 + "the deviceName capability"
+    search_index.set_body("perfecto:self:selenium", body)
+    hit = search_index.search("devicename", 5, get_body=lambda document: body)[0]
+    assert "deviceName" in hit["snippet"]
+    hit = search_index.search("devicename", 5)[0]
+    assert hit["snippet"].startswith("filler")
+
+
+def test_title_change_keeps_body_terms():
+    search_index = create_index()
+    search_index.set_titles([
+        ("perfecto:self:appium", "perfecto", "self", "appium", "Appium 2 capabilities"),
+        ("perfecto:self:selenium", "perfecto", "self", "selenium", "Selenium grid"),
+    ])
+    assert search_index.search("securitytoken", 5)[0]["title"] == "Appium 2 capabilities"
+    assert search_index.pending_bodies() == ["perfecto:self:selenium"]
+
+
+def test_body_change_removes_old_terms():
+    search_index = create_index()
+    search_index.set_body("perfecto:self:appium", "Set the platformName capability")
+    assert search_index.search("securitytoken", 5) == []
+    assert search_index.search("appium", 5)[0]["help_id"] == "appium"
+    assert search_index.total_length == sum(document["length"] for document in search_index.documents.values())
+
+
+def test_round_trip():
+    search_index = create_index()
+    loaded = HelpSearchIndex.from_dict(search_index.copy().to_dict())
+    assert loaded.documents == search_index.documents
+    assert loaded.postings == search_index.postings
+    assert loaded.search("capability grid", 5) == search_index.search("capability grid", 5)
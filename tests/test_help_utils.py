@@ -0,0 +1,49 @@
+"""
+Tests of the help page conversion and of the help TOC javascript parsing.
+The expected markdown files of tests/help_pages were produced by the converter before the single buffer rewrite,
+so the golden tests check that the rewrite converts the help pages exactly as before.
+"""
+from pathlib import Path
+
+import pytest
+
+from tools.help_utils import html_to_markdown, convert_js_to_py_dict
+
+HELP_PAGES_PATH = Path(__file__).parent / "help_pages"
+HELP_PAGE_URL = "https://help.perfecto.io/perfecto-help/content/perfecto/test-automation/page.htm"
+
+
+@pytest.mark.parametrize("page", sorted(HELP_PAGES_PATH.glob("*.html")), ids=lambda page: page.stem)
+def test_html_to_markdown_golden(page):
+    expected = page.with_suffix(".md").read_text(encoding="utf-8")
+    assert html_to_markdown(page.read_text(encoding="utf-8"), HELP_PAGE_URL) + "\n" == expected
+
+
+def test_html_to_markdown_skips_comments():
+    html = '<div role="main"><!-- toc --><h1>Title</h1><div><!-- note --><p>Text</p></div></div>'
+    assert html_to_markdown(html) == "# Title\nText"
+
+
+@pytest.mark.parametrize("js_text, expected", [
+    ("define({'/content/a.htm':{i:[1],t:['Selenium\\'s grid'],b:['']}});",
+     {"/content/a.htm": {"i": [1], "t": ["Selenium's grid"], "b": [""]}}),
+    ("define({\n  // line comment\n  a: 1, /* block\n comment */ b: 'x // not a comment /* either */'\n});",
+     {"a": 1, "b": "x // not a comment /* either */"}),
+    ("define({t:['define(x);', 'a); b', \"define(\"]});", {"t": ["define(x);", "a); b", "define("]}),
+    ("define({a:[1,2,],b:{c:3,},});", {"a": [1, 2], "b": {"c": 3}}),
+    ("define({t:['{a: 1, b: 2}', ',c:']});", {"t": ["{a: 1, b: 2}", ",c:"]}),
+    ("define({t:[\"say \\\"hi\\\"\", 'it\\'s \"quoted\"', 'tab\\there', '\\x41\\u00e9']});",
+     {"t": ['say "hi"', 'it\'s "quoted"', "tab\there", "A\u00e9"]}),
+    ("define({$key:'v', key_2 : 'w'});", {"$key": "v", "key_2": "w"}),
+])
+def test_convert_js_to_py_dict(js_text, expected):
+    assert convert_js_to_py_dict(js_text) == expected
+
+
+def test_convert_js_to_py_dict_keeps_control_characters():
+    assert convert_js_to_py_dict("define({t:['\x00', \"a\x00\\'\"]});") == {"t": ["\x00", "a\x00'"]}
+
+
+def test_convert_js_to_py_dict_rejects_invalid_data():
+    with pytest.raises(ValueError):
+        convert_js_to_py_dict("define({t:['unterminated]});")
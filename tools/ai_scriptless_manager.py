@@ -1,4 +1,7 @@
+import asyncio
+import hashlib
 import json
+import time
 import traceback
 from typing import Optional, Any, Dict
 
@@ -8,66 +11,140 @@ from pydantic import Field
 
 from config import perfecto
 from config.perfecto import TOOLS_PREFIX, SUPPORT_MESSAGE
+from config.settings import AI_SCRIPTLESS_CATALOG_TTL, AI_SCRIPTLESS_PARALLEL, AI_SCRIPTLESS_MAX_PARALLEL
 from config.token import PerfectoToken, token_verify
-from formatters.ai_scriptless import format_ai_scriptless_tests, \
-    format_ai_scriptless_tests_filter_values
+from formatters.ai_scriptless import format_ai_scriptless_catalog
 from models.manager import Manager
 from models.result import BaseResult, PaginationResult
-from tools.utils import api_request
+from tools.cache import TTLCache
+from tools.execution_manager import ExecutionManager, TERMINAL_EXECUTION_STATUSES
+from tools.utils import api_request, get_page_size, encode_cursor, decode_cursor, get_next_poll_interval
+
+EXECUTE_WAIT_MAX_TIMEOUT = 3600
+# This mapping allows us to detect when the AI gets confused and uses Perfecto-style capabilities.
+# It also allows for reverse mapping from internal to capabilities from Perfecto.
+DEVICE_UNDER_TEST_ATT_MAP = {
+    "real": {
+        "device_id": "deviceId"
+    },
+    "virtual": {
+        "platform_name": "platformName",
+        "manufacturer": "manufacturer",
+        "model": "model",
+        "platform_version": "platformVersion"
+    },
+    "desktop": {
+        "platform_name": "platformName",
+        "platform_version": "platformVersion",
+        "browser_name": "browserName",
+        "browser_version": "browserVersion",
+        "resolution": "resolution",
+        "location": "location"
+    }
+}
+# Tolerance between the local clock and the reporting start time of the launched execution
+EXECUTE_WAIT_CLOCK_SKEW_MS = 60 * 1000
+# Key of the started execution id in the answer of the executor
+LAUNCH_EXECUTION_ID_KEY = "executionId"
+# list_tests args that select the tests, a cursor is only valid with the same ones
+TEST_FILTER_NAMES = ["test_name", "visibility", "owner_list"]
 
 
 class AiScriptlessManager(Manager):
+    # Static to share between different instance of AiScriptlessManager, the key is the cloud name
+    catalog_cache = TTLCache(ttl=AI_SCRIPTLESS_CATALOG_TTL, is_cacheable=lambda result: result.error is None)
+
     def __init__(self, token: Optional[PerfectoToken], ctx: Context):
         super().__init__(token, ctx)
 
+    async def _load_catalog(self) -> BaseResult:
+        tree_url = perfecto.get_ai_scriptless_api_url(self.token.cloud_name)
+        tree_url = tree_url + "/scripts/tree"
+        return await api_request(self.token, "GET", endpoint=tree_url, result_formatter=format_ai_scriptless_catalog)
+
+    @staticmethod
+    def _get_filter_hash(args: dict[str, Any]) -> str:
+        # Identify the filters of a cursor, the order and the repetitions of the owners don't change the tests
+        filters = {name: args[name] for name in TEST_FILTER_NAMES if args.get(name) is not None}
+        if "owner_list" in filters:
+            filters["owner_list"] = sorted(set(filters["owner_list"]))
+        return hashlib.sha256(json.dumps(filters, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
     @token_verify
     async def list_tests(self, args: dict[str, Any]) -> BaseResult:
-        page_size = 50
+        page_size = get_page_size(args)
         page_index = args.get("page_index", 1)
         skip = (page_size * page_index) - page_size
 
-        tree_url = perfecto.get_ai_scriptless_api_url(self.token.cloud_name)
-        tree_url = tree_url + "/scripts/tree"
-        tests_result = await api_request(self.token, "GET", endpoint=tree_url,
-                                         result_formatter=format_ai_scriptless_tests,
-                                         result_formatter_params={"page_size": page_size, "skip": skip,
-                                                                  "filters": args})
+        catalog_result = await AiScriptlessManager.catalog_cache.get(self.token.cloud_name, self._load_catalog)
+        if catalog_result.error is not None:
+            return catalog_result
+        catalog = catalog_result.result
 
+        after = None
+        if args.get("cursor"):
+            cursor = decode_cursor(args["cursor"])
+            if cursor is None or "position" not in cursor or cursor.get("filter") != self._get_filter_hash(args):
+                return BaseResult(
+                    error="Invalid cursor, use the cursor returned by the previous list_tests call with the same "
+                          "filters."
+                )
+            # The tree can change between calls, locate the last test by key and fall back to its old position
+            after = catalog.key_index.get(cursor.get("key"), cursor["position"])
+            skip = cursor.get("offset", 0)
+            page_index = skip // page_size + 1
+        tests, has_more = catalog.search(args, skip if after is None else 0, page_size, after)
+        items = [test.summary() for test in tests]
+
+        next_cursor = None
+        if has_more and tests:
+            next_cursor = encode_cursor({
+                "filter": self._get_filter_hash(args),
+                "key": tests[-1].key,
+                "position": catalog.key_index[tests[-1].key],
+                "offset": skip + len(tests),
+            })
         page_result = PaginationResult(
-            items=tests_result.result,
-            count=len(tests_result.result),
+            items=items,
+            count=len(items),
             page=page_index,
             offset=skip,
             next_offset=skip + page_size,
-            has_more=page_size - len(tests_result.result) <= 0,
+            has_more=has_more,
+            cursor=next_cursor,
         )
 
         return BaseResult(
             result=page_result,
-            error=tests_result.error,
-            warning=tests_result.warning,
-            info=tests_result.info,
+            error=catalog_result.error,
+            warning=catalog_result.warning,
+            info=catalog_result.info,
         )
 
     @token_verify
     async def list_filter_values(self, filter_names: list[str]) -> BaseResult:
-        tree_url = perfecto.get_ai_scriptless_api_url(self.token.cloud_name)
-        tree_url = tree_url + "/scripts/tree"
-        filter_values_result = await api_request(self.token, "GET", endpoint=tree_url,
-                                                 result_formatter=format_ai_scriptless_tests_filter_values)
+        catalog_result = await AiScriptlessManager.catalog_cache.get(self.token.cloud_name, self._load_catalog)
+        if catalog_result.error is not None:
+            return catalog_result
+        catalog_filter_values = catalog_result.result.filter_values
+        valid_filter_names = ["test_name", "owner_list"]
         filter_values = {}
+        filter_counts = {}
         filter_not_found = []
         for filter_name in filter_names:
-            if filter_name in filter_values_result.result:
-                filter_values[filter_name] = filter_values_result.result[filter_name]
+            if filter_name in valid_filter_names:
+                filter_values[filter_name] = catalog_filter_values[filter_name]
+                filter_counts[filter_name] = catalog_filter_values["counts"][filter_name]
             else:
                 filter_not_found.append(filter_name)
+        if len(filter_counts) > 0:
+            filter_values["counts"] = filter_counts
 
         error = None
         warnings = None
         if len(filter_not_found) > 0:
             error = f"Error, invalid filter_names values: {','.join(filter_not_found)}"
-            warnings = [f"Make sure to use valid filter_names values: {','.join(['test_name', 'owner_list'])}"]
+            warnings = [f"Make sure to use valid filter_names values: {','.join(valid_filter_names)}"]
 
         return BaseResult(
             result=filter_values,
@@ -75,74 +152,239 @@ class AiScriptlessManager(Manager):
             warning=warnings,
         )
 
-    @token_verify
-    async def execute_test(self, test_id: str, device_type: str, device_under_test: dict[str, Any]) -> BaseResult:
-        execute_url = perfecto.get_ai_scriptless_execution_api_url(self.token.cloud_name)
-
-        # This mapping allows us to detect when the AI gets confused and uses Perfecto-style capabilities.
-        # It also allows for reverse mapping from internal to capabilities from Perfecto.
-        att_map = {
-            "real": {
-                "device_id": "deviceId"
-            },
-            "virtual": {
-                "platform_name": "platformName",
-                "manufacturer": "manufacturer",
-                "model": "model",
-                "platform_version": "platformVersion"
-            },
-            "desktop": {
-                "platform_name": "platformName",
-                "platform_version": "platformVersion",
-                "browser_name": "browserName",
-                "browser_version": "browserVersion",
-                "resolution": "resolution",
-                "location": "location"
-            }
-        }
-
+    @staticmethod
+    def _get_dut(device_type: str, device_under_test: dict[str, Any]) -> tuple[Optional[str], Optional[str]]:
+        """
+        DUT parameter of the execution for the device, remapped to Perfecto capabilities, or the validation error.
+        """
         dut = None
         remapped_device_under_test = {}
         # Remap the attributes to Perfecto Capabilities format
-        if device_type in att_map.keys():
-            for key in att_map[device_type].keys():
-                alt_key = att_map[device_type][key]
+        if device_type in DEVICE_UNDER_TEST_ATT_MAP.keys():
+            for key in DEVICE_UNDER_TEST_ATT_MAP[device_type].keys():
+                alt_key = DEVICE_UNDER_TEST_ATT_MAP[device_type][key]
                 remapped_device_under_test[alt_key] = device_under_test.get(key, device_under_test.get(alt_key, None))
 
         if device_type == "real":
             dut = remapped_device_under_test.get("deviceId", None)
             if dut is None:
-                return BaseResult(
-                    error="Invalid value for device_under_test. The key device_id could not be found."
-                )
+                return None, "Invalid value for device_under_test. The key device_id could not be found."
         elif device_type in ["virtual", "desktop"]:
             # Verify if all the needed keys exist on the remapped version
             key_not_found = []
-            for key in att_map[device_type].keys():
-                alt_key = att_map[device_type][key]
-                if alt_key not in remapped_device_under_test:
+            for key in DEVICE_UNDER_TEST_ATT_MAP[device_type].keys():
+                alt_key = DEVICE_UNDER_TEST_ATT_MAP[device_type][key]
+                if remapped_device_under_test.get(alt_key) is None:
                     key_not_found.append(key)
             if len(key_not_found) == 0:
                 dut = json.dumps(remapped_device_under_test, separators=(',', ':'))
             else:
                 keys_not_found_str = ",".join(key_not_found)
-                return BaseResult(
-                    error=f"Invalid value for device_under_test. The keys [{keys_not_found_str}] could not be found."
-                )
-        if dut is not None and len(dut) > 0:
-            body = {
-                "params": {
-                    "DUT": dut
-                },
-                "testKey": test_id,
-                "triggerType": "Manual"
-            }
-            return await api_request(self.token, "POST", endpoint=execute_url, json=body)
-        else:
+                return None, f"Invalid value for device_under_test. The keys [{keys_not_found_str}] could not be found."
+        if dut is None or len(dut) == 0:
+            return None, "Invalid device_type or device_under_test value."
+        return dut, None
+
+    async def _launch_test(self, test_id: str, dut: str) -> BaseResult:
+        execute_url = perfecto.get_ai_scriptless_execution_api_url(self.token.cloud_name)
+        body = {
+            "params": {
+                "DUT": dut
+            },
+            "testKey": test_id,
+            "triggerType": "Manual"
+        }
+        return await api_request(self.token, "POST", endpoint=execute_url, json=body)
+
+    @token_verify
+    async def execute_test(self, test_id: str, device_type: str, device_under_test: dict[str, Any]) -> BaseResult:
+        dut, error = self._get_dut(device_type, device_under_test)
+        if error is not None:
+            return BaseResult(
+                error=error
+            )
+        return await self._launch_test(test_id, dut)
+
+    @token_verify
+    async def execute_matrix(self, test_ids: list[str], devices: list[dict[str, Any]], max_parallel: int,
+                             timeout: int) -> BaseResult:
+        """
+        Run each test on each device and wait for the reports, up to max_parallel executions running at the same
+        time (each one holds its slot from the launch until it finishes or the timeout expires). The tests of the
+        same device run one after another. Each device is validated once, and a failed execution is reported in
+        its row without stopping the others.
+        """
+        timeout = min(max(0, timeout), EXECUTE_WAIT_MAX_TIMEOUT)
+        catalog_result = await AiScriptlessManager.catalog_cache.get(self.token.cloud_name, self._load_catalog)
+        if catalog_result.error is not None:
+            return catalog_result
+        catalog = catalog_result.result
+        # The runs of each device, the real devices listed several times are the same device
+        device_runs: dict[tuple, list[tuple[int, str, str]]] = {}
+        invalid_devices = []
+        for index, device in enumerate(devices):
+            device_type = device.get("device_type", "real")
+            dut, error = self._get_dut(device_type, device.get("device_under_test", {}))
+            if error is not None:
+                invalid_devices.append({"device_index": index, "error": error})
+            else:
+                device_runs.setdefault(("real", dut) if device_type == "real" else (index,), []).append(
+                    (index, device_type, dut))
+        test_ids = list(dict.fromkeys(test_ids))
+        semaphore = asyncio.Semaphore(max(1, min(max_parallel, AI_SCRIPTLESS_MAX_PARALLEL)))
+        total_runs = len(test_ids) * (len(devices) - len(invalid_devices))
+        finished = 0
+
+        async def run(test_id: str, device_index: int, device_type: str, dut: str) -> list[Any]:
+            nonlocal finished
+            if test_id not in catalog.key_index:
+                result, error = None, f"Test {test_id} not found, use list_tests to get a valid test_id."
+            else:
+                async with semaphore:
+                    try:
+                        result = await self._launch_and_wait(test_id, catalog.tests[catalog.key_index[test_id]].name,
+                                                             device_type, dut, timeout, notify_progress=False)
+                        error = result.error
+                    except httpx.HTTPStatusError as e:
+                        result, error = None, f"HTTP error {e.response.status_code}"
+                    except httpx.HTTPError as e:
+                        result, error = None, f"HTTP error {type(e).__name__}: {e}"
+            finished += 1
+            await self.report_progress(finished, total_runs, f"Finished {finished} executions")
+            if error is not None:
+                return [test_id, device_index, device_type, dut, "ERROR", error]
+            if result.warning:
+                return [test_id, device_index, device_type, dut, "TIMEOUT", result.result["report_url"]]
+            return [test_id, device_index, device_type, dut, result.result["status"], result.result["report_url"]]
+
+        async def run_device(device_duts: list[tuple[int, str, str]]) -> list[list[Any]]:
+            return [await run(test_id, device_index, device_type, dut)
+                    for test_id in test_ids for device_index, device_type, dut in device_duts]
+
+        device_rows = await asyncio.gather(*[run_device(device_duts) for device_duts in device_runs.values()])
+        # One row by test and device, in the order of the test ids and then of the devices
+        rows = sorted([row for rows in device_rows for row in rows],
+                      key=lambda row: (test_ids.index(row[0]), row[1]))
+        failed = sum(1 for row in rows if row[4] == "ERROR")
+        timed_out = sum(1 for row in rows if row[4] == "TIMEOUT")
+        warnings = None
+        if failed or timed_out or invalid_devices:
+            warnings = [f"{failed} executions failed to run, {timed_out} didn't finish in {timeout} seconds (they "
+                        f"keep running) and {len(invalid_devices)} devices are invalid, see the rows with status "
+                        f"ERROR or TIMEOUT and invalid_devices"]
+        return BaseResult(
+            result={
+                "finished": len(rows) - failed - timed_out,
+                "failed": failed,
+                "timed_out": timed_out,
+                "invalid_devices": invalid_devices,
+                "columns": ["test_id", "device_index", "device_type", "dut", "status", "detail"],
+                "rows": rows,
+            },
+            warning=warnings,
+        )
+
+    @staticmethod
+    def _get_launch_execution_id(launch: Any) -> Optional[str]:
+        if isinstance(launch, dict) and launch.get(LAUNCH_EXECUTION_ID_KEY) is not None:
+            return str(launch[LAUNCH_EXECUTION_ID_KEY])
+        return None
+
+    @token_verify
+    async def execute_and_wait(self, test_id: str, device_type: str, device_under_test: dict[str, Any],
+                               timeout: int) -> BaseResult:
+        """
+        Execute the test and wait in the server for its report: the report executions of the test started since
+        the launch are polled with adaptive backoff and the progress is notified while waiting. The report is the
+        one with the execution id returned by the launch, otherwise the first one of the test on the device (for a
+        real device) that wasn't there just before the launch.
+        A client cancellation stops the wait, the launched execution keeps running.
+        """
+        timeout = min(max(0, timeout), EXECUTE_WAIT_MAX_TIMEOUT)
+        dut, error = self._get_dut(device_type, device_under_test)
+        if error is not None:
+            return BaseResult(
+                error=error
+            )
+        catalog_result = await AiScriptlessManager.catalog_cache.get(self.token.cloud_name, self._load_catalog)
+        if catalog_result.error is not None:
+            return catalog_result
+        catalog = catalog_result.result
+        if test_id not in catalog.key_index:
             return BaseResult(
-                error="Invalid device_type or device_under_test value."
+                error=f"Test {test_id} not found, use list_tests to get a valid test_id."
             )
+        test_name = catalog.tests[catalog.key_index[test_id]].name
+
+        return await self._launch_and_wait(test_id, test_name, device_type, dut, timeout)
 
+    async def _launch_and_wait(self, test_id: str, test_name: str, device_type: str, dut: str, timeout: int,
+                               notify_progress: bool = True) -> BaseResult:
+        """
+        Launch the test and poll its report execution until it finishes or the timeout expires (see execute_and_wait).
+        """
+        execution_manager = ExecutionManager(self.token, self.ctx)
+        device_id = dut if device_type == "real" else None
+        launched_at = time.monotonic()
+        started_since = int(time.time() * 1000) - EXECUTE_WAIT_CLOCK_SKEW_MS
+        # Executions already reported before the launch, in case the launch doesn't return the execution id
+        previous_executions = await execution_manager.list_recent_report_executions(test_name, started_since,
+                                                                                     device_id)
+        if previous_executions.error is not None:
+            return previous_executions
+        previous_ids = {execution.test_id for execution in previous_executions.result}
+        launch = await self._launch_test(test_id, dut)
+        if launch.error is not None:
+            return launch
+        launch_id = self._get_launch_execution_id(launch.result)
+
+        interval = None
+        last_status = None
+        while True:
+            if launch_id is not None:
+                found = await execution_manager.find_report_execution(launch_id)
+            else:
+                found = await execution_manager.list_recent_report_executions(test_name, started_since, device_id)
+            if found.error is not None:
+                return BaseResult(
+                    result={"launch": launch.result},
+                    error=found.error,
+                )
+            if launch_id is not None:
+                execution = found.result
+            else:
+                matching = [item for item in found.result
+                            if item.test_name == test_name and item.test_id not in previous_ids]
+                # Newest first, the execution of this launch is the oldest one started since the launch
+                execution = matching[-1] if matching else None
+            status = execution.status if execution is not None else "LAUNCHED"
+            elapsed = time.monotonic() - launched_at
+            if execution is not None and (status in TERMINAL_EXECUTION_STATUSES or execution.end_timestamp):
+                return BaseResult(
+                    result={
+                        "status": status,
+                        "report_url": execution.execution_url,
+                        "execution": execution,
+                        "elapsed": round(elapsed, 1),
+                        "launch": launch.result,
+                    }
+                )
+            if elapsed >= timeout:
+                return BaseResult(
+                    result={
+                        "status": status,
+                        "report_url": execution.execution_url if execution is not None else None,
+                        "elapsed": round(elapsed, 1),
+                        "launch": launch.result,
+                    },
+                    warning=[f"The execution didn't finish in {timeout} seconds, it keeps running. "
+                             f"Use watch_live_executions or list_report_executions to follow it."],
+                )
+            if notify_progress:
+                await self.report_progress(elapsed, timeout, f"Test {test_name}: {status}")
+            interval = get_next_poll_interval(interval, status != last_status)
+            last_status = status
+            await asyncio.sleep(min(interval, timeout - elapsed))
 
 def register(mcp, token: Optional[PerfectoToken]):
     @mcp.tool(
@@ -156,9 +398,12 @@ Actions:
         visibility (str, default='PRIVATE' values=['PUBLIC', 'PRIVATE']): The visibility, PUBLIC=All Public Tests, PRIVATE=My private tests.
         owner_list (list[str], values= use first list_filter_values tool with 'owner_list'): The list of users to filter tests (owners).
         page_index (int, default=1), The current page number. If the result mention has_next_page in true, asks the user if they want to see the next page.
+        page_size (int, default=50, max=500): The number of tests of each page.
+        cursor (str): The cursor returned by the previous page, to read the next page (use the same filters, page_index is not needed).
 - list_filter_values: List the values needed for list_tests filters.
     args(dict): Dictionary with the following required filter parameters:
         filter_names (list[str], values=['test_name', 'owner_list']): The filter name list.
+    The result also includes "counts" with the number of tests for each test name and each owner (creator or modifier).
 - execute_test: Execute a preconfigured AI Scriptless Test.
     args(dict): Dictionary with the following required parameters:
         test_id (str): Test ID from list_tests()
@@ -168,6 +413,18 @@ Actions:
             When device_type='virtual': {platform_name: str, manufacturer: str, model: str, platform_version: str} (Get from list_virtual_devices()).
             When device_type='desktop': {platform_name: str, platform_version: str, browser_name: str, 
                           browser_version: str, resolution: str, location: str} (Get from list_desktop_devices()).
+- execute_and_wait: Execute a preconfigured AI Scriptless Test and wait in the server until it finishes, notifying the progress.
+    Returns the final status and the report URL in a single call.
+    args(dict): Dictionary with the same parameters of execute_test, and:
+        timeout (int, default=1800, max=3600): Maximum seconds to wait, the execution keeps running when it expires.
+- execute_matrix: Execute several AI Scriptless Tests on several devices (each test on each device) in a single call and wait until they finish.
+    The devices run concurrently, the tests of each device one after another. The result is an aggregated report with one row by test and device,
+    with the final status and the report URL (detail).
+    args(dict): Dictionary with the following parameters:
+        test_id_list (list[str], required): Test IDs from list_tests().
+        device_list (list[dict], required): Devices, each one {device_type: str, device_under_test: dict} like the execute_test parameters.
+        max_parallel (int, default=5, max=20): Maximum number of executions running at the same time.
+        timeout (int, default=1800, max=3600): Maximum seconds to wait for each execution, it keeps running when it expires (status TIMEOUT).
 Hints:
 - IMPORTANT: Always call list_filter_values first to get valid filter values before using any filters in list_tests. 
   This ensures you're using the correct test name, list of owners users or other filter values that actually exist in the system.
@@ -178,9 +435,10 @@ Hints:
      - 'real': list_real_devices() (get device_id).
      - 'virtual': list_virtual_devices() (get platform_name, manufacturer, model, platform_version).
      - 'desktop': list_desktop_devices() (get platform_name, platform_version, browser_name, browser_version, resolution, location).
-  3. On real device use read_real_device_info() (verify device is available and not in use).
-  4. execute_test() (execute the test).
-  5. list_report_executions() with report name equal to test name and list_live_executions() when the device it's in use (monitor execution progress).
+  3. On real device use read_real_device_info() (verify device is available and not in use), or wait_for_device() when it's in use.
+  4. execute_and_wait() (execute the test and wait for its final status and report URL), or execute_test() to only launch it.
+  5. After execute_test(), watch_live_executions() to wait for the execution to finish (it notifies the progress), then list_report_executions() with report name equal to test name.
+- Use execute_matrix instead of calling execute_test once by test and device for regression sweeps.
 - Always check before running a test_id if the device_type and device_under_test exist and is available (when it's a real device), not use device in use or malfunctioning.
 - Always monitor a real device's operation while it's in use by checking the information with read_real_device_info().
 - Always stop the execution by stopping the live execution (make sure it's the correct execution, such as the execution name or user ID).
@@ -204,6 +462,16 @@ Hints:
                     return await ai_scriptless_manager.execute_test(args.get("test_id", ""),
                                                                     args.get("device_type", ""),
                                                                     args.get("device_under_test", {}))
+                case "execute_matrix":
+                    return await ai_scriptless_manager.execute_matrix(args.get("test_id_list", []),
+                                                                      args.get("device_list", []),
+                                                                      args.get("max_parallel", AI_SCRIPTLESS_PARALLEL),
+                                                                      args.get("timeout", 1800))
+                case "execute_and_wait":
+                    return await ai_scriptless_manager.execute_and_wait(args.get("test_id", ""),
+                                                                        args.get("device_type", ""),
+                                                                        args.get("device_under_test", {}),
+                                                                        args.get("timeout", 1800))
                 case _:
                     return BaseResult(
                         error=f"Action {action} not found in AI Scriptless manager tool"
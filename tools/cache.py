@@ -0,0 +1,227 @@
+"""
+In-memory and on-disk caches shared by the Perfecto MCP tools.
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Asynchronous cache where each entry lives `ttl` seconds.
+    Entries older than `refresh_after` seconds are still served while they are reloaded in background,
+    expired entries are reloaded before answering. Concurrent loads of the same key are shared.
+    """
+
+    def __init__(self, ttl: float, refresh_after: Optional[float] = None,
+                 is_cacheable: Optional[Callable[[Any], bool]] = None):
+        self.ttl = ttl
+        self.refresh_after = refresh_after if refresh_after is not None else ttl * 0.75
+        self.is_cacheable = is_cacheable
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+        self._loading: dict[Hashable, asyncio.Future] = {}
+        self._background_tasks: set[asyncio.Task] = set()
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None:
+                loaded_at, value = entry
+                age = time.monotonic() - loaded_at
+                if age < self.ttl:
+                    if age >= self.refresh_after and key not in self._loading:
+                        task = asyncio.create_task(self._load(key, loader))
+                        self._background_tasks.add(task)
+                        task.add_done_callback(self._background_done)
+                    return value
+            loading = self._loading.get(key)
+            if loading is None:
+                return await self._load(key, loader)
+            try:
+                return await asyncio.shield(loading)
+            except asyncio.CancelledError:
+                # The caller running the load was cancelled, load again unless this caller was cancelled too
+                if not loading.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            # Not an error of the load, the other callers waiting for it retry
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Avoid "exception never retrieved" warnings when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            if self.is_cacheable is None or self.is_cacheable(value):
+                self._entries[key] = (time.monotonic(), value)
+            future.set_result(value)
+            return value
+        finally:
+            self._loading.pop(key, None)
+
+    def _background_done(self, task: asyncio.Task):
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug("Background cache refresh failed", exc_info=task.exception())
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """
+        Remove one key from the cache, or all the keys when no key is given.
+        """
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+
+class LRUCache:
+    """
+    Memory bounded least recently used cache, the size in bytes of each entry is given by the caller.
+    Keeps hit/miss counters of the lookups.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the cached value without counting the lookup or refreshing the entry.
+        """
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def get(self, key: Hashable, is_valid: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or (is_valid is not None and not is_valid(entry[0])):
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: int):
+        self.invalidate(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+
+    def invalidate(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "size": self.size,
+            "max_size": self.max_bytes,
+        }
+
+
+class DiskCache:
+    """
+    Size bounded cache of immutable JSON documents in a local directory, shared by the server processes.
+    Each entry is a gzip file named by the SHA-256 of its key, replaced atomically. When the directory grows
+    beyond `max_bytes` the least recently read entries are removed. The methods are blocking.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _get_path(self, key: str) -> Path:
+        key_hash = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / key_hash[:2] / f"{key_hash}.json.gz"
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._get_path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                value = json.load(f)
+            # The modification time tracks the last read, for the eviction
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError):
+            logger.debug("Failed to read disk cache entry %s", path, exc_info=True)
+            return None
+
+    def put(self, key: str, value: Any):
+        path = self._get_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_file = tempfile.mkstemp(prefix=f"{path.name}.", suffix=".tmp", dir=path.parent)
+            try:
+                with os.fdopen(fd, "wb") as f, gzip.GzipFile(fileobj=f, mode="wb") as gz:
+                    gz.write(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+                size = os.path.getsize(temp_file)
+                os.replace(temp_file, path)
+            except BaseException:
+                os.unlink(temp_file)
+                raise
+        except OSError:
+            logger.debug("Failed to write disk cache entry %s", path, exc_info=True)
+            return
+        with self._lock:
+            if self.size is None:
+                self.size = sum(entry_size for _, _, entry_size in self._entries())
+            else:
+                self.size += size
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> list[tuple[Path, float, int]]:
+        entries = []
+        for entry in self.directory.glob("*/*.json.gz"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((entry, stat.st_mtime, stat.st_size))
+        return entries
+
+    def _evict(self):
+        # Other processes share the directory, so the size is measured again before removing entries
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        self.size = sum(entry_size for _, _, entry_size in entries)
+        # Leave some room, to not evict again on each write
+        target = self.max_bytes * 0.9
+        for entry, _, entry_size in entries:
+            if self.size <= target:
+                break
+            try:
+                entry.unlink()
+            except FileNotFoundError:
+                pass
+            self.size -= entry_size
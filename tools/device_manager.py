@@ -1,3 +1,5 @@
+import asyncio
+import time
 import traceback
 from typing import Optional, Any, Dict
 
@@ -7,15 +9,29 @@ from pydantic import Field
 
 from config import perfecto
 from config.perfecto import TOOLS_PREFIX, SUPPORT_MESSAGE
+from config.settings import REAL_DEVICE_INVENTORY_TTL, REAL_DEVICE_READ_CONCURRENCY
 from config.token import PerfectoToken, token_verify
-from formatters.device import format_real_device, format_virtual_device
+from formatters.device import format_real_device, format_virtual_device, format_real_device_inventory, \
+    format_real_device_status, REAL_DEVICE_STATUS_COLUMNS
 from formatters.grid import format_grid_info
+from models.device import REAL_DEVICE_INDEX_FIELDS, RealDevice, RealDeviceInventory
 from models.manager import Manager
-from models.result import BaseResult
-from tools.utils import api_request
+from models.result import BaseResult, PaginationResult
+from tools.cache import TTLCache
+from tools.utils import api_request, get_page_size, get_next_poll_interval
+
+WAIT_FOR_DEVICE_MAX_TIMEOUT = 3600
 
 
 class DeviceManager(Manager):
+    # Static to share between different instance of DeviceManager, the key is the cloud name
+    inventory_cache = TTLCache(ttl=REAL_DEVICE_INVENTORY_TTL, is_cacheable=lambda result: result.error is None)
+    # Devices awaited by wait_for_device (device id, filters and future) and their shared poller, by cloud name
+    device_waiters: dict[str, list[tuple[Optional[str], dict[str, Any], asyncio.Future]]] = {}
+    device_pollers: dict[str, asyncio.Task] = {}
+    # Set when a waiter is added, so the poller checks it right away instead of at its next poll
+    device_poller_wakeups: dict[str, asyncio.Event] = {}
+
     def __init__(self, token: Optional[PerfectoToken], ctx: Context):
         super().__init__(token, ctx)
 
@@ -43,12 +59,179 @@ class DeviceManager(Manager):
         return await api_request(self.token, "POST", endpoint=devices_url, json=body,
                                  result_formatter=format_real_device)
 
+    async def _load_inventory(self) -> BaseResult:
+        devices_url = perfecto.get_real_device_management_api_url(self.token.cloud_name)
+        body = {
+            "device": {
+            }
+        }
+        return await api_request(self.token, "POST", endpoint=devices_url, json=body,
+                                 result_formatter=format_real_device_inventory)
+
+    @token_verify
+    async def query_real_devices(self, args: dict[str, Any]) -> BaseResult:
+        page_size = get_page_size(args)
+        page_index = args.get("page_index", 1)
+        skip = (page_size * page_index) - page_size
+        if args.get("refresh", False):
+            DeviceManager.inventory_cache.invalidate(self.token.cloud_name)
+        inventory_result = await DeviceManager.inventory_cache.get(self.token.cloud_name, self._load_inventory)
+        if inventory_result.error is not None:
+            return inventory_result
+        inventory = inventory_result.result
+
+        positions = inventory.query(args)
+        devices = [inventory.devices[position] for position in positions[skip:skip + page_size]]
+        page_result = PaginationResult(
+            items=devices,
+            count=len(devices),
+            total=len(positions),
+            page=page_index,
+            offset=skip,
+            next_offset=skip + page_size,
+            has_more=skip + page_size < len(positions),
+        )
+        return BaseResult(
+            result={
+                "devices": page_result,
+                "facets": inventory.facets(positions),
+            }
+        )
+
+    @staticmethod
+    def _find_free_device(inventory: RealDeviceInventory, device_id: Optional[str], filters: dict[str, Any]) -> Optional[RealDevice]:
+        for position in inventory.query({**filters, "in_use": "false"}):
+            device = inventory.devices[position]
+            if device_id is None or device.device_id == device_id:
+                return device
+        return None
+
+    async def _poll_devices(self, cloud_name: str):
+        """
+        Single poller of the device inventory for all the wait_for_device calls of the cloud, it runs while there
+        are waiters. The poll interval grows while the set of free devices doesn't change, a new waiter wakes the
+        poller up and resets the interval. Each poll reloads the inventory cache, so the load is shared with
+        query_real_devices.
+        """
+        wakeup = DeviceManager.device_poller_wakeups.setdefault(cloud_name, asyncio.Event())
+        interval = None
+        free_device_ids = None
+        while DeviceManager.device_waiters.get(cloud_name):
+            waiters = DeviceManager.device_waiters[cloud_name]
+            wakeup.clear()
+            try:
+                DeviceManager.inventory_cache.invalidate(cloud_name)
+                inventory_result = await DeviceManager.inventory_cache.get(cloud_name, self._load_inventory)
+            except Exception as e:
+                for _, _, future in waiters:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            if inventory_result.error is not None:
+                for _, _, future in waiters:
+                    if not future.done():
+                        future.set_result(inventory_result)
+                return
+
+            inventory = inventory_result.result
+            for device_id, filters, future in list(waiters):
+                device = self._find_free_device(inventory, device_id, filters)
+                if device is not None and not future.done():
+                    future.set_result(device)
+            current_free_device_ids = {device.device_id for device in inventory.devices if device.in_use == "false"}
+            interval = get_next_poll_interval(interval, current_free_device_ids != free_device_ids)
+            free_device_ids = current_free_device_ids
+            try:
+                await asyncio.wait_for(wakeup.wait(), interval)
+                interval = None
+            except asyncio.TimeoutError:
+                pass
+
+    @token_verify
+    async def wait_for_device(self, args: dict[str, Any]) -> BaseResult:
+        """
+        Wait in the server until a real device matching the device id or the capabilities is available and not in use,
+        or the timeout expires. All the concurrent waits share one poller of the device inventory.
+        """
+        cloud_name = self.token.cloud_name
+        device_id = args.get("device_id")
+        filters = {field: args[field] for field in REAL_DEVICE_INDEX_FIELDS if field in args and field != "in_use"}
+        if not device_id and not filters:
+            return BaseResult(
+                error="Indicate the device_id or at least one capability (like platform_name or model) to wait for."
+            )
+        timeout = min(max(0, args.get("timeout", 300)), WAIT_FOR_DEVICE_MAX_TIMEOUT)
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (device_id, filters, future)
+        DeviceManager.device_waiters.setdefault(cloud_name, []).append(waiter)
+        poller = DeviceManager.device_pollers.get(cloud_name)
+        if poller is None or poller.done():
+            DeviceManager.device_pollers[cloud_name] = asyncio.create_task(self._poll_devices(cloud_name))
+        else:
+            DeviceManager.device_poller_wakeups.setdefault(cloud_name, asyncio.Event()).set()
+        started_at = time.monotonic()
+        try:
+            device = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return BaseResult(
+                result={"available": False, "waited": round(time.monotonic() - started_at, 1)},
+                warning=[f"No matching device was available in {timeout} seconds."],
+            )
+        finally:
+            DeviceManager.device_waiters[cloud_name].remove(waiter)
+        if isinstance(device, BaseResult):
+            return device
+        return BaseResult(
+            result={"available": True, "device": device, "waited": round(time.monotonic() - started_at, 1)},
+        )
+
     @token_verify
     async def read_real_device_info(self, device_id: str) -> BaseResult:
         devices_url = perfecto.get_real_device_management_api_url(self.token.cloud_name)
         devices_url = f"{devices_url}/{device_id}"
         return await api_request(self.token, "GET", endpoint=devices_url)
 
+    @token_verify
+    async def read_real_devices_info(self, device_ids: list[str]) -> BaseResult:
+        """
+        Read several real devices concurrently (up to REAL_DEVICE_READ_CONCURRENCY requests at the same time) and
+        return a compact status table. A failed device has its error in the row without failing the others.
+        """
+        semaphore = asyncio.Semaphore(REAL_DEVICE_READ_CONCURRENCY)
+        devices_url = perfecto.get_real_device_management_api_url(self.token.cloud_name)
+
+        async def read_device(device_id: str) -> list[Any]:
+            async with semaphore:
+                try:
+                    device = await api_request(self.token, "GET", endpoint=f"{devices_url}/{device_id}",
+                                               result_formatter=format_real_device_status)
+                    error = device.error
+                except httpx.HTTPStatusError as e:
+                    device, error = None, f"HTTP error {e.response.status_code}"
+                except httpx.HTTPError as e:
+                    device, error = None, f"HTTP error {type(e).__name__}: {e}"
+            if error is not None:
+                return [device_id] + [None] * (len(REAL_DEVICE_STATUS_COLUMNS) - 1) + [error]
+            row = device.result
+            row[0] = row[0] or device_id
+            return row + [None]
+
+        # Keep the order of the ids, reading each repeated id once
+        device_ids = list(dict.fromkeys(device_ids))
+        rows = await asyncio.gather(*[read_device(device_id) for device_id in device_ids])
+        failed = [row[0] for row in rows if row[-1] is not None]
+        warnings = None
+        if failed:
+            warnings = [f"Failed to read {len(failed)} of {len(rows)} devices: {', '.join(failed)}"]
+        return BaseResult(
+            result={
+                "columns": list(REAL_DEVICE_STATUS_COLUMNS.keys()) + ["error"],
+                "rows": rows,
+            },
+            warning=warnings,
+        )
+
     @token_verify
     async def list_virtual_devices(self) -> BaseResult:
         virtual_device_url = perfecto.get_virtual_device_management_api_url(self.token.cloud_name)
@@ -68,11 +251,36 @@ Operations on Perfecto devices information.
 Actions:
 - read_selenium_grid_info: Read the main Selenium Grid information like the Selenium Grid URL (for Selenium or Appium).
 - list_real_devices: List all real available devices (iOS and Android devices, Mobile and Tablet).
+- query_real_devices: Search the available real devices and count them by facet (platform_name, platform_version, manufacturer, model, location, status, in_use).
+    args(dict): Dictionary with the following optional filter parameters (each one a value or a list of values, case-insensitive):
+        platform_name (str | list[str]): The platform names (like Android or iOS).
+        platform_version (str | list[str]): The platform versions.
+        manufacturer (str | list[str]): The manufacturers.
+        model (str | list[str]): The models.
+        location (str | list[str]): The locations.
+        status (str | list[str]): The device statuses.
+        in_use (str | list[str], values=['true', 'false']): Whether the device is in use.
+        page_index (int, default=1): The current page number.
+        page_size (int, default=50, max=500): The number of devices of each page.
+        refresh (bool, default=False): Reload the device inventory (it's cached for a few seconds).
+    The facets have the number of matching devices by value of each field.
 - read_real_device_info: Read the real device information.
-    args(dict): Dictionary with the following required parameters:
+    args(dict): Dictionary with one of the following parameters:
         device_id (str): The device Id to show detailed information.
+        device_id_list (list[str]): Several device Ids, read concurrently in a single call. The result is a compact status table
+            (device_id, platform_name, platform_version, manufacturer, model, location, status, in_use, available, error) with one row by device.
+- wait_for_device: Wait in the server until a real device is available and not in use, and return it.
+    args(dict): Dictionary with the device_id or at least one capability to match:
+        device_id (str): The device Id to wait for.
+        platform_name, platform_version, manufacturer, model, location, status (str | list[str]): The capabilities to match (like query_real_devices).
+        timeout (int, default=300, max=3600): Maximum seconds to wait.
 - list_virtual_devices: List all available virtual devices (iOS Simulators and Android Emulators).
 - list_desktop_devices: List all desktop browser devices (Desktop Web Browsers).
+Hints:
+- Use query_real_devices with filters instead of list_real_devices to find devices (like free Android devices of a model), 
+  the facets show the available values without listing all the devices.
+- To check several devices before a multi-device run, use read_real_device_info with device_id_list instead of one call by device.
+- Use wait_for_device instead of checking read_real_device_info repeatedly until a device is free.
 """
     )
     async def devices(
@@ -89,7 +297,13 @@ Actions:
                     return await device_manager.read_selenium_grid_info()
                 case "list_real_devices":
                     return await device_manager.list_real_devices()
+                case "query_real_devices":
+                    return await device_manager.query_real_devices(args)
+                case "wait_for_device":
+                    return await device_manager.wait_for_device(args)
                 case "read_real_device_info":
+                    if "device_id_list" in args:
+                        return await device_manager.read_real_devices_info(args["device_id_list"])
                     return await device_manager.read_real_device_info(args["device_id"])
                 case "list_virtual_devices":
                     return await device_manager.list_virtual_devices()
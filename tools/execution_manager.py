@@ -1,5 +1,11 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
 import traceback
 from datetime import datetime, timedelta
+from heapq import merge
 from typing import Optional, Any, Dict
 
 import httpx
@@ -8,16 +14,60 @@ from pydantic import Field
 
 from config import perfecto
 from config.perfecto import TOOLS_PREFIX, SUPPORT_MESSAGE
+from config.settings import EXECUTION_METADATA_TTL, EXECUTION_PAGE_CONCURRENCY, EXECUTION_MAX_ITEMS, \
+    EXECUTION_STORE, EXECUTION_STORE_DAYS, EXECUTION_STORE_SYNC_INTERVAL, EXECUTION_STORE_SYNC_MAX_ITEMS, \
+    EXECUTION_READ_CONCURRENCY, EXECUTION_SUMMARY_CACHE_SIZE
 from config.token import PerfectoToken, token_verify
-from formatters.execution import format_executions
+from formatters.execution import format_executions, get_executions_total, format_executions_analysis, \
+    format_command_summary, format_live_executions_snapshot
 from models.manager import Manager
+from models.execution import Execution
 from models.result import BaseResult, PaginationResult
-from tools.utils import api_request
+from tools.cache import TTLCache, LRUCache, DiskCache
+from tools.execution_store import ExecutionStore
+from tools.utils import api_request, get_page_size, encode_cursor, decode_cursor, MAX_PAGE_SIZE, get_cache_path, \
+    get_date_time_iso, get_next_poll_interval
+
+HOUR_MS = 60 * 60 * 1000
+DAY_MS = 24 * HOUR_MS
+MAX_TIME_SHARDS = 200
+# With time_shard auto the day shards are only used to read beyond this offset. Until there a single search is
+# cheaper than counting the executions of each shard (one request per day of the time frame on a cold cache)
+AUTO_SHARD_MIN_OFFSET = 10000
+EXECUTION_STORE_FILE = "executions.db"
+EXECUTION_SUMMARY_CACHE_DIR = "command_summaries"
+# The command summary of an execution with one of these statuses doesn't change anymore
+TERMINAL_EXECUTION_STATUSES = ["PASSED", "FAILED", "BLOCKED"]
+# Search field of the execution id (the testExecutionId of the report executions)
+REPORT_EXECUTION_ID_FIELD = "testExecutionId"
+# The synchronization reads again the executions still running started in this window, an older one without a
+# terminal status nor end time (e.g. UNKNOWN) is considered stale
+RUNNING_EXECUTION_MAX_AGE = DAY_MS
+LIVE_WATCH_MAX_TIMEOUT = 3600
+
+logger = logging.getLogger(__name__)
 
 
 class ExecutionManager(Manager):
+    # Static to share between different instance of ExecutionManager, the key is the cloud name
+    metadata_cache = TTLCache(ttl=EXECUTION_METADATA_TTL, is_cacheable=lambda result: result.error is None)
+    # Executions count of the past time shards (they don't change often), by cloud name and shard search body
+    shard_total_cache = TTLCache(ttl=EXECUTION_METADATA_TTL, is_cacheable=lambda count: count[0].error is None)
+    # Local execution store (only when enabled), shared by all the clouds
+    execution_store: Optional[ExecutionStore] = None
+    # Last synchronization of the local execution store, by cloud name
+    store_sync_cache = TTLCache(ttl=EXECUTION_STORE_SYNC_INTERVAL, refresh_after=EXECUTION_STORE_SYNC_INTERVAL,
+                                is_cacheable=lambda result: result.error is None)
+    # Background reads of the executions missing in the local execution store, by cloud name
+    store_backfills: dict[str, asyncio.Task] = {}
+    # Ids of the executions listed with a terminal status (each entry counts as one), and their summaries on disk
+    terminal_executions = LRUCache(max_bytes=100000)
+    summary_cache: Optional[DiskCache] = None
+
     def __init__(self, token: Optional[PerfectoToken], ctx: Context):
         super().__init__(token, ctx)
+        # The searches of this instance are answered by the local execution store
+        self.use_store = False
 
         self.metadata_map = {
             "tag_list": "tags_v2",
@@ -55,6 +105,95 @@ class ExecutionManager(Manager):
         execution_management_url = execution_management_url + "/search"
         return await api_request(self.token, "POST", endpoint=execution_management_url)
 
+    @staticmethod
+    def _diff_live_executions(previous: dict[str, dict[str, Any]],
+                              snapshot: dict[str, dict[str, Any]]) -> list[dict[str, Any]]:
+        changes = []
+        now = get_date_time_iso(time.time())
+        for execution_id, execution in snapshot.items():
+            previous_execution = previous.get(execution_id)
+            if previous_execution is None:
+                changes.append({"event": "started", "execution_id": execution_id, **execution, "time": now})
+            elif previous_execution["status"] != execution["status"]:
+                changes.append({"event": "status_changed", "execution_id": execution_id, **execution,
+                                "previous_status": previous_execution["status"], "time": now})
+        for execution_id, execution in previous.items():
+            if execution_id not in snapshot:
+                changes.append({"event": "finished", "execution_id": execution_id, **execution, "time": now})
+        return changes
+
+    @token_verify
+    async def watch_live_executions(self, args: dict[str, Any]) -> BaseResult:
+        """
+        Poll the live executions and push only their changes (started, finished, status changed) to the client
+        as log notifications, until the watched executions finish or the timeout expires. The snapshots are
+        compared by execution id and the poll interval grows while nothing changes.
+        """
+        timeout = min(max(0, args.get("timeout", 300)), LIVE_WATCH_MAX_TIMEOUT)
+        execution_ids = set(args.get("execution_id_list", []))
+        started_at = time.monotonic()
+        watched = set(execution_ids)
+        seen = set()
+        previous = None
+        events = []
+        interval = None
+        polls = 0
+        while True:
+            live_executions = await self.list_live_executions()
+            polls += 1
+            if live_executions.error is not None:
+                return BaseResult(
+                    result={"events": events, "polls": polls},
+                    error=live_executions.error,
+                )
+            snapshot = format_live_executions_snapshot(live_executions.result)
+            if snapshot is None:
+                return BaseResult(
+                    result={"events": events, "polls": polls},
+                    error="The live executions search returned no execution list, the executions can't be watched.",
+                )
+            if execution_ids:
+                snapshot = {key: value for key, value in snapshot.items() if key in execution_ids}
+            if previous is None:
+                changes = []
+                if not execution_ids:
+                    # Without ids, watch the executions running now and the ones started meanwhile
+                    watched = set(snapshot)
+            else:
+                changes = self._diff_live_executions(previous, snapshot)
+                if not execution_ids:
+                    watched.update(change["execution_id"] for change in changes if change["event"] == "started")
+            for change in changes:
+                events.append(change)
+                message = f"Execution {change['execution_id']} ({change['name']}) {change['event']}"
+                if change["event"] == "status_changed":
+                    message += f" from {change['previous_status']} to {change['status']}"
+                elif change["event"] == "started":
+                    message += f" with status {change['status']}"
+                await self.notify(message)
+            previous = snapshot
+            seen.update(snapshot)
+
+            running = [execution_id for execution_id in watched if execution_id in snapshot]
+            elapsed = time.monotonic() - started_at
+            if not running or elapsed >= timeout:
+                break
+            interval = get_next_poll_interval(interval, len(changes) > 0)
+            await self.report_progress(elapsed, timeout, f"{len(running)} executions running")
+            await asyncio.sleep(min(interval, timeout - elapsed))
+
+        result = {
+            "events": events,
+            "running": [{"execution_id": execution_id, **snapshot[execution_id]} for execution_id in running],
+            # Watched ids never seen running (already finished or wrong ids)
+            "not_live": sorted(execution_ids - seen),
+            "timed_out": len(running) > 0,
+            "polls": polls,
+        }
+        return BaseResult(
+            result=result,
+        )
+
     @token_verify
     async def stop_live_executions(self, execution_id_list: list[str]) -> BaseResult:
         execution_management_url = perfecto.get_execution_management_api_url(self.token.cloud_name)
@@ -79,11 +218,15 @@ class ExecutionManager(Manager):
         body = {}
         return await api_request(self.token, "POST", endpoint=report_management_url, json=body)
 
-    @token_verify
-    async def list_filter_values(self, filter_names: list[str]) -> BaseResult:
+    async def _load_metadata(self) -> BaseResult:
         metadata_management_url = perfecto.get_test_execution_metadata_api_url(self.token.cloud_name)
+        return await api_request(self.token, "GET", endpoint=metadata_management_url)
 
-        metadata_result = await api_request(self.token, "GET", endpoint=metadata_management_url)
+    @token_verify
+    async def list_filter_values(self, filter_names: list[str]) -> BaseResult:
+        metadata_result = await ExecutionManager.metadata_cache.get(self.token.cloud_name, self._load_metadata)
+        if metadata_result.error is not None:
+            return metadata_result
         metadata = metadata_result.result
         filter_values = {}
         filter_not_found = []
@@ -109,10 +252,16 @@ class ExecutionManager(Manager):
         )
 
     @token_verify
-    async def list_report_executions(self, args: dict[str, Any]) -> BaseResult:
-        page_size = 50
-        page_index = args.get("page_index", 1)
-        skip = (page_size * page_index) - page_size
+    async def invalidate_filter_values(self) -> BaseResult:
+        ExecutionManager.metadata_cache.invalidate(self.token.cloud_name)
+        return BaseResult(
+            info=["The cached filter values were discarded, the next list_filter_values call will reload them."]
+        )
+
+    def _get_search_body(self, args: dict[str, Any]) -> dict[str, Any]:
+        """
+        Search body (filter and sort) of the report executions matching the list_report_executions args.
+        """
         report_name = args.get("report_name", "")
         time_frame = args.get("time_frame", "latest")
         start_time_str = args.get("start_time", "")
@@ -137,9 +286,6 @@ class ExecutionManager(Manager):
             end_time_dt = end_time_dt.replace(hour=0, minute=0, second=0, microsecond=0)
             end_time = int(end_time_dt.timestamp() * 1000)
 
-        report_management_url = perfecto.get_test_execution_management_api_url(self.token.cloud_name)
-        report_management_url = report_management_url + "/search"
-
         body = {
             "filter": {
                 "fieldNameToSearchFilter": {
@@ -157,9 +303,7 @@ class ExecutionManager(Manager):
                     "sortBy": "startTime",
                     "sortOrder": "DESCEND"
                 }
-            ],
-            "skip": skip,
-            "pageSize": page_size
+            ]
         }
         if time_frame == "custom":
             body["filter"]["fields"]["endExecutionTime"] = [end_time]
@@ -168,18 +312,365 @@ class ExecutionManager(Manager):
             filter_values = args.get(filter_arg, [])
             if len(filter_values) > 0:
                 body["filter"]["fields"][target] = filter_values
+        return body
+
+    async def _search_executions(self, body: dict[str, Any], skip: int,
+                                 page_size: int) -> tuple[BaseResult, Optional[int]]:
+        """
+        Search one page of report executions, returns the formatted page and the total of matching executions
+        when the API reports it.
+        """
+        report_management_url = perfecto.get_test_execution_management_api_url(self.token.cloud_name)
+        report_management_url = report_management_url + "/search"
+
+        if self.use_store:
+            items, total = await asyncio.to_thread(self._get_execution_store().search, self.token.cloud_name, body,
+                                                   skip, page_size)
+            self._add_terminal_executions(items)
+            return BaseResult(result=items), total
+        executions = await api_request(self.token, "POST", endpoint=report_management_url,
+                                       json={**body, "skip": skip, "pageSize": page_size})
+        if executions.error is not None:
+            return executions, None
+        total = get_executions_total(executions.result)
+        executions.result = format_executions(executions.result, {"cloud_name": self.token.cloud_name})
+        self._add_terminal_executions(executions.result)
+        return executions, total
+
+    def _add_terminal_executions(self, executions: list[Execution]):
+        for execution in executions:
+            if execution.status in TERMINAL_EXECUTION_STATUSES:
+                for execution_id in [execution.test_id, execution.execution_id]:
+                    ExecutionManager.terminal_executions.put((self.token.cloud_name, execution_id), True, 1)
+
+    @staticmethod
+    def _get_execution_store() -> Optional[ExecutionStore]:
+        if not EXECUTION_STORE:
+            return None
+        if ExecutionManager.execution_store is None:
+            ExecutionManager.execution_store = ExecutionStore(get_cache_path() / EXECUTION_STORE_FILE)
+        return ExecutionManager.execution_store
+
+    async def _read_store_executions(self, start_time: int, end_time: Optional[int]) -> BaseResult:
+        """
+        Read up to EXECUTION_STORE_SYNC_MAX_ITEMS executions started in the time frame, newest first, using the same
+        search of list_report_executions.
+        """
+        body = self._get_search_body({})
+        body["filter"]["fields"]["startExecutionTime"] = [start_time]
+        if end_time is not None:
+            body["filter"]["fields"]["endExecutionTime"] = [end_time]
+        shards = self._get_time_shards(body, "auto", EXECUTION_STORE_SYNC_MAX_ITEMS)
+        return await self._list_all_report_executions(body, shards, 0, MAX_PAGE_SIZE, 1,
+                                                      EXECUTION_STORE_SYNC_MAX_ITEMS)
+
+    async def _sync_execution_store(self) -> BaseResult:
+        """
+        Save in the local store the executions started since its watermark (the newest start time already stored)
+        and read again the stored executions still running, from the oldest one without a terminal status and
+        without end time started in the last RUNNING_EXECUTION_MAX_AGE. The executions older than what a sync can read are left to the background backfill, the
+        first sync only records the sync state and leaves the last EXECUTION_STORE_DAYS days to the backfill.
+        """
+        store = self._get_execution_store()
+        cloud_name = self.token.cloud_name
+        state = await asyncio.to_thread(store.get_sync_state, cloud_name)
+        # Aligned to the start of the day, like the time frames of list_report_executions
+        retention_start_dt = datetime.now() - timedelta(days=EXECUTION_STORE_DAYS)
+        retention_start = int(retention_start_dt.replace(hour=0, minute=0, second=0, microsecond=0).timestamp() * 1000)
+        items = []
+        if state is None:
+            coverage_start = retention_start
+            complete_since = watermark = int(time.time() * 1000)
+        else:
+            coverage_start = max(state["coverage_start"], retention_start)
+            complete_since = max(state["complete_since"], coverage_start)
+            watermark = state["watermark"]
+            oldest_running = await asyncio.to_thread(store.get_oldest_running, cloud_name,
+                                                     TERMINAL_EXECUTION_STATUSES,
+                                                     int(time.time() * 1000) - RUNNING_EXECUTION_MAX_AGE)
+            sync_start = max(complete_since, min(watermark, oldest_running or watermark))
+            executions = await self._read_store_executions(sync_start, None)
+            if executions.error is not None:
+                return BaseResult(error=executions.error)
+            items = [execution for execution in executions.result.items if execution.start_timestamp is not None]
+            if executions.result.has_more and items:
+                # The oldest executions since sync_start were not read, the backfill reads them
+                complete_since = items[-1].start_timestamp
+            watermark = max([execution.start_timestamp for execution in items], default=watermark)
+        await asyncio.to_thread(store.save, cloud_name, items, coverage_start, complete_since, watermark)
+
+        info = []
+        if complete_since > coverage_start:
+            self._start_execution_store_backfill()
+            info.append(f"The executions started before {get_date_time_iso(complete_since / 1000)} are being read "
+                        f"in background, until then the searches of that time frame are answered by the API.")
+        return BaseResult(
+            result={
+                "synchronized_executions": len(items),
+                "stored_since": get_date_time_iso(coverage_start / 1000),
+                "complete_since": get_date_time_iso(complete_since / 1000),
+                "newest_start_time": get_date_time_iso(watermark / 1000),
+            },
+            info=info or None
+        )
+
+    def _start_execution_store_backfill(self):
+        cloud_name = self.token.cloud_name
+        backfill = ExecutionManager.store_backfills.get(cloud_name)
+        if backfill is None or backfill.done():
+            # Without the tool context, the backfill outlives the tool call that started it
+            manager = ExecutionManager(self.token, None)
+            ExecutionManager.store_backfills[cloud_name] = asyncio.create_task(manager._backfill_execution_store())
+
+    async def _backfill_execution_store(self):
+        """
+        Read the executions missing in the local store, from complete_since back to coverage_start, newest first and
+        up to EXECUTION_STORE_SYNC_MAX_ITEMS executions by round.
+        """
+        store = self._get_execution_store()
+        cloud_name = self.token.cloud_name
+        try:
+            while True:
+                state = await asyncio.to_thread(store.get_sync_state, cloud_name)
+                if state is None or state["complete_since"] <= state["coverage_start"]:
+                    return
+                executions = await self._read_store_executions(state["coverage_start"], state["complete_since"])
+                if executions.error is not None:
+                    logger.debug("Failed to backfill the execution store of %s: %s", cloud_name, executions.error)
+                    return
+                items = [execution for execution in executions.result.items if execution.start_timestamp is not None]
+                complete_since = state["coverage_start"]
+                if executions.result.has_more and items:
+                    complete_since = items[-1].start_timestamp
+                await asyncio.to_thread(store.save, cloud_name, items, state["coverage_start"], complete_since,
+                                        state["watermark"])
+        except Exception:
+            logger.debug("Failed to backfill the execution store of %s", cloud_name, exc_info=True)
+
+    async def _use_execution_store(self, body: dict[str, Any]) -> bool:
+        """
+        Whether the search can be answered by the local execution store (enabled, supporting the filters and
+        completely synchronized for the time frame), synchronizing it first when the last sync is older than the
+        sync interval.
+        """
+        store = self._get_execution_store()
+        if store is None or not store.supports(body):
+            return False
+        sync = await ExecutionManager.store_sync_cache.get(self.token.cloud_name, self._sync_execution_store)
+        if sync.error is not None:
+            return False
+        state = await asyncio.to_thread(store.get_sync_state, self.token.cloud_name)
+        # Until the backfill has read the time frame, the search is answered by the API
+        return state is not None and body["filter"]["fields"]["startExecutionTime"][0] >= state["complete_since"]
+
+    @token_verify
+    async def sync_execution_store(self) -> BaseResult:
+        if self._get_execution_store() is None:
+            return BaseResult(
+                error="The local execution store is disabled, "
+                      f"set the environment variable {perfecto.EXECUTION_STORE_ENV_NAME}=true to enable it."
+            )
+        ExecutionManager.store_sync_cache.invalidate(self.token.cloud_name)
+        return await ExecutionManager.store_sync_cache.get(self.token.cloud_name, self._sync_execution_store)
+
+    @staticmethod
+    def _get_time_shards(body: dict[str, Any], time_shard: str, end_offset: int) -> Optional[list[dict[str, Any]]]:
+        """
+        Split the search time frame in day or hour shards, newest first. None when the search is not sharded,
+        with auto only the time frames wider than one day are split in days, when reading up to end_offset goes
+        beyond AUTO_SHARD_MIN_OFFSET.
+        """
+        fields = body["filter"]["fields"]
+        start_time = fields["startExecutionTime"][0]
+        end_time = fields.get("endExecutionTime", [None])[0] or int(time.time() * 1000)
+        if time_shard == "auto":
+            time_shard = "day" if end_time - start_time > DAY_MS and end_offset > AUTO_SHARD_MIN_OFFSET else "none"
+        if time_shard == "hour" and (end_time - start_time) / HOUR_MS > MAX_TIME_SHARDS:
+            time_shard = "day"
+        if time_shard not in ["day", "hour"] or (end_time - start_time) / DAY_MS > MAX_TIME_SHARDS:
+            return None
+        shard_size = DAY_MS if time_shard == "day" else HOUR_MS
+
+        # The shards are aligned to the start of the time frame, so the past shards keep the same boundaries
+        shards = []
+        shard_start = start_time
+        while shard_start < end_time:
+            shard_end = min(shard_start + shard_size, end_time)
+            shards.append({
+                "start": shard_start,
+                "end": shard_end - 1 if shard_end < end_time else end_time,
+                "total": None,
+            })
+            shard_start = shard_end
+        shards.reverse()
+        return shards
+
+    @staticmethod
+    def _get_shard_body(body: dict[str, Any], shard: dict[str, Any]) -> dict[str, Any]:
+        fields = {**body["filter"]["fields"], "startExecutionTime": [shard["start"]],
+                  "endExecutionTime": [shard["end"]]}
+        return {**body, "filter": {**body["filter"], "fields": fields}}
 
-        executions = await api_request(self.token, "POST", endpoint=report_management_url, json=body,
-                                       result_formatter=format_executions,
-                                       result_formatter_params={"cloud_name": self.token.cloud_name})
+    async def _search_sharded_executions(self, body: dict[str, Any], shards: list[dict[str, Any]], skip: int,
+                                         page_size: int) -> tuple[BaseResult, Optional[int]]:
+        """
+        Search one page of report executions over the time shards. The shard totals locate the shards holding
+        the page, so any page costs the same: one count per shard (only the first time) and one read of each
+        shard holding part of the page. The shard pages are combined with a k-way merge by start time.
+        """
+        semaphore = asyncio.Semaphore(EXECUTION_PAGE_CONCURRENCY)
+
+        async def search_shard(shard: dict[str, Any], shard_skip: int, shard_page_size: int):
+            async with semaphore:
+                return await self._search_executions(self._get_shard_body(body, shard), shard_skip, shard_page_size)
+
+        if not shards:
+            return await self._search_executions(body, skip, page_size)
+        async def count_shard(shard: dict[str, Any]):
+            if shard is shards[0]:
+                # The newest shard is still receiving executions
+                return await search_shard(shard, 0, 1)
+            cache_key = (self.token.cloud_name, json.dumps(self._get_shard_body(body, shard), sort_keys=True))
+            return await ExecutionManager.shard_total_cache.get(cache_key, lambda: search_shard(shard, 0, 1))
+
+        pending_shards = [shard for shard in shards if shard["total"] is None]
+        counts = await asyncio.gather(*[count_shard(shard) for shard in pending_shards])
+        for shard, (count, shard_total) in zip(pending_shards, counts):
+            if count.error is not None:
+                return count, None
+            if shard_total is None:
+                # Without totals the page can't be located, use a single search (also for the next pages)
+                shards.clear()
+                return await self._search_executions(body, skip, page_size)
+            shard["total"] = shard_total
+
+        shard_reads = []
+        shard_offset = 0
+        for shard in shards:
+            shard_skip = max(0, skip - shard_offset)
+            if shard_offset < skip + page_size and shard_skip < shard["total"]:
+                shard_reads.append(search_shard(shard, shard_skip, min(page_size, shard["total"] - shard_skip)))
+            shard_offset += shard["total"]
+        total = shard_offset
+
+        pages = await asyncio.gather(*shard_reads)
+        for page, _ in pages:
+            if page.error is not None:
+                return page, None
+        items = []
+        seen = set()
+        for execution in merge(*[page.result for page, _ in pages], key=lambda e: e.start_timestamp or 0,
+                               reverse=True):
+            if execution.test_id in seen:
+                continue
+            seen.add(execution.test_id)
+            items.append(execution)
+            if len(items) >= page_size:
+                break
+        return BaseResult(result=items), total
+
+    async def _search_page(self, body: dict[str, Any], shards: Optional[list[dict[str, Any]]], skip: int,
+                           page_size: int) -> tuple[BaseResult, Optional[int]]:
+        if shards is None:
+            return await self._search_executions(body, skip, page_size)
+        return await self._search_sharded_executions(body, shards, skip, page_size)
+
+    @staticmethod
+    def _get_filter_hash(body: dict[str, Any]) -> str:
+        # Identify the search filters of a cursor, without the time frame that moves with the cursor
+        fields = {key: value for key, value in body["filter"]["fields"].items()
+                  if key not in ["startExecutionTime", "endExecutionTime"]}
+        search = {**body, "filter": {**body["filter"], "fields": fields}}
+        return hashlib.sha256(json.dumps(search, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    def _get_executions_cursor(self, body: dict[str, Any], items: list[Execution], next_offset: int,
+                               cursor: Optional[dict[str, Any]] = None) -> Optional[str]:
+        """
+        Cursor of the page after the items: the start time of the last execution and the ids already returned
+        with that start time, as the search is only sorted by start time.
+        """
+        if not items or items[-1].start_timestamp is None:
+            return None
+        last_start_time = items[-1].start_timestamp
+        ids = [execution.test_id for execution in items if execution.start_timestamp == last_start_time]
+        if cursor is not None and cursor["end"] == last_start_time:
+            ids = cursor["ids"] + ids
+        return encode_cursor({
+            "filter": self._get_filter_hash(body),
+            "start": body["filter"]["fields"]["startExecutionTime"][0],
+            "end": last_start_time,
+            "ids": ids,
+            "offset": next_offset,
+        })
+
+    async def _list_report_executions_after(self, body: dict[str, Any], cursor: str, page_size: int) -> BaseResult:
+        """
+        Read the page after the cursor, searching the executions started until the cursor start time. The cost is
+        the same for any page and the executions started meanwhile don't shift the pages.
+        """
+        cursor_data = decode_cursor(cursor)
+        if cursor_data is None or cursor_data.get("filter") != self._get_filter_hash(body):
+            return BaseResult(
+                error="Invalid cursor, use the cursor returned by the previous list_report_executions call "
+                      "with the same filters."
+            )
+        body["filter"]["fields"]["startExecutionTime"] = [cursor_data["start"]]
+        body["filter"]["fields"]["endExecutionTime"] = [cursor_data["end"]]
+        seen_ids = set(cursor_data["ids"])
+
+        executions, _ = await self._search_executions(body, 0, page_size + len(seen_ids))
+        if executions.error is not None:
+            return executions
+        items = [execution for execution in executions.result if execution.test_id not in seen_ids][:page_size]
+        has_more = len(executions.result) >= page_size + len(seen_ids)
+        offset = cursor_data["offset"]
 
+        page_result = PaginationResult(
+            items=items,
+            count=len(items),
+            total=None,
+            page=offset // page_size + 1,
+            offset=offset,
+            next_offset=offset + page_size,
+            has_more=has_more,
+            cursor=self._get_executions_cursor(body, items, offset + len(items), cursor_data) if has_more else None,
+        )
+        return BaseResult(
+            result=page_result,
+        )
+
+    @token_verify
+    async def list_report_executions(self, args: dict[str, Any]) -> BaseResult:
+        page_size = get_page_size(args)
+        page_index = args.get("page_index", 1)
+        skip = (page_size * page_index) - page_size
+        body = self._get_search_body(args)
+        self.use_store = await self._use_execution_store(body)
+        if args.get("cursor"):
+            return await self._list_report_executions_after(body, args["cursor"], page_size)
+        all_pages = args.get("all_pages", False) or "max_items" in args
+        max_items = args.get("max_items", EXECUTION_MAX_ITEMS)
+        # The local store doesn't need shards
+        shards = None if self.use_store else self._get_time_shards(
+            body, args.get("time_shard", "auto"), skip + (max_items if all_pages else page_size))
+
+        if all_pages:
+            return await self._list_all_report_executions(body, shards, skip, page_size, page_index, max_items)
+
+        executions, total = await self._search_page(body, shards, skip, page_size)
+        if executions.error is not None:
+            return executions
+
+        has_more = page_size - len(executions.result) <= 0
         page_result = PaginationResult(
             items=executions.result,
             count=len(executions.result),
+            total=total,
             page=page_index,
             offset=skip,
             next_offset=skip + page_size,
-            has_more=page_size - len(executions.result) <= 0,
+            has_more=has_more,
+            cursor=self._get_executions_cursor(body, executions.result, skip + page_size) if has_more else None,
         )
 
         return BaseResult(
@@ -190,8 +681,161 @@ class ExecutionManager(Manager):
         )
 
     @token_verify
-    async def red_report_execution(self, execution_id: str) -> BaseResult:
+    async def find_report_execution(self, execution_id: str) -> BaseResult:
+        """
+        Report execution of the execution id (the one returned by a launch), None while it isn't reported.
+        """
+        body = {
+            "filter": {
+                "fields": {
+                    REPORT_EXECUTION_ID_FIELD: [execution_id]
+                }
+            },
+            "sort": [
+                {
+                    "sortBy": "startTime",
+                    "sortOrder": "DESCEND"
+                }
+            ]
+        }
+        executions, _ = await self._search_executions(body, 0, 1)
+        if executions.error is not None:
+            return executions
+        matching = [execution for execution in executions.result if execution.execution_id == execution_id]
+        return BaseResult(
+            result=matching[0] if matching else None,
+        )
+
+    @token_verify
+    async def list_recent_report_executions(self, report_name: str, started_since: int,
+                                            device_id: Optional[str] = None) -> BaseResult:
+        """
+        Report executions of the report name started since the given time (on the device when given), newest first
+        and up to MAX_PAGE_SIZE.
+        """
+        body = self._get_search_body({"report_name": report_name, "device_id_list": [device_id] if device_id else []})
+        body["filter"]["fields"]["startExecutionTime"] = [started_since]
+        executions, _ = await self._search_executions(body, 0, MAX_PAGE_SIZE)
+        return executions
+
+    async def _list_all_report_executions(self, body: dict[str, Any], shards: Optional[list[dict[str, Any]]],
+                                          skip: int, page_size: int, page_index: int, max_items: int) -> BaseResult:
+        """
+        Walk the result pages from skip until there are no more executions or max_items executions were read.
+        The first page is read alone, then the next pages are requested concurrently: all the pages needed when
+        the first page reports the total, otherwise in rounds of EXECUTION_PAGE_CONCURRENCY pages.
+        """
+        first_page, total = await self._search_page(body, shards, skip, page_size)
+        if first_page.error is not None:
+            return first_page
+        expected = max_items if total is None else max(0, min(max_items, total - skip))
+        progress_total = expected if total is not None else None
+        read_count = min(len(first_page.result), expected)
+        await self.report_progress(read_count, progress_total, f"Read {read_count} report executions")
+        semaphore = asyncio.Semaphore(EXECUTION_PAGE_CONCURRENCY)
 
+        async def read_page(page_skip: int) -> BaseResult:
+            nonlocal read_count
+            async with semaphore:
+                page, _ = await self._search_page(body, shards, page_skip, page_size)
+            if page.error is None:
+                read_count = min(read_count + len(page.result), expected)
+                await self.report_progress(read_count, progress_total, f"Read {read_count} report executions")
+            return page
+
+        items = []
+        error = None
+        pages = [first_page]
+        has_more = True
+        while has_more:
+            for page in pages:
+                if page.error is not None:
+                    error = page.error
+                    break
+                page_items = page.result[:max_items - len(items)]
+                items.extend(page_items)
+                # A short page is the last one, a trimmed page means that there are more executions
+                has_more = len(page_items) < len(page.result) or (
+                        len(page.result) >= page_size and (total is None or skip + len(items) < total))
+                if not has_more or len(items) >= max_items:
+                    break
+            if error is not None or not has_more or len(items) >= max_items:
+                break
+
+            next_skip = skip + len(items)
+            remaining = max_items - len(items)
+            if total is not None:
+                remaining = min(remaining, total - next_skip)
+            pages_count = -(-remaining // page_size)
+            if total is None:
+                pages_count = min(pages_count, EXECUTION_PAGE_CONCURRENCY)
+            pages = await asyncio.gather(*[read_page(next_skip + i * page_size) for i in range(pages_count)])
+
+        page_result = PaginationResult(
+            items=items,
+            count=len(items),
+            total=total,
+            page=page_index,
+            offset=skip,
+            next_offset=skip + len(items),
+            has_more=has_more,
+            cursor=self._get_executions_cursor(body, items, skip + len(items)) if has_more else None,
+        )
+        info = None
+        if has_more and error is None:
+            info = [f"Stopped after reading max_items ({max_items}) executions, there are more executions available"]
+        return BaseResult(
+            result=page_result,
+            error=error,
+            info=info,
+        )
+
+    @token_verify
+    async def analyze_executions(self, args: dict[str, Any]) -> BaseResult:
+        page_size = get_page_size(args, MAX_PAGE_SIZE)
+        body = self._get_search_body(args)
+        self.use_store = await self._use_execution_store(body)
+        max_items = args.get("max_items", EXECUTION_MAX_ITEMS)
+        shards = None if self.use_store else self._get_time_shards(body, args.get("time_shard", "auto"), max_items)
+        executions = await self._list_all_report_executions(body, shards, 0, page_size, 1, max_items)
+        if executions.result is None:
+            return executions
+
+        page_result = executions.result
+        analysis = format_executions_analysis(page_result.items, {"top": args.get("top", 20)})
+        warnings = None
+        if page_result.has_more:
+            warnings = [f"Only the newest {page_result.count} executions were analyzed, "
+                        f"use a bigger max_items or a narrower time frame to analyze all of them"]
+        return BaseResult(
+            result=analysis,
+            error=executions.error,
+            warning=warnings,
+            info=["Durations are in seconds, pass_rate in percentage of the runs"],
+        )
+
+    @staticmethod
+    def _get_summary_cache() -> Optional[DiskCache]:
+        if EXECUTION_SUMMARY_CACHE_SIZE <= 0:
+            return None
+        if ExecutionManager.summary_cache is None:
+            ExecutionManager.summary_cache = DiskCache(get_cache_path() / EXECUTION_SUMMARY_CACHE_DIR,
+                                                       EXECUTION_SUMMARY_CACHE_SIZE)
+        return ExecutionManager.summary_cache
+
+    def _is_terminal_execution(self, execution_id: str, summary: Any) -> bool:
+        """
+        Whether the execution finished: listed before with a terminal status, or reported with one in the summary.
+        """
+        if ExecutionManager.terminal_executions.peek((self.token.cloud_name, execution_id)) is not None:
+            return True
+        return isinstance(summary, dict) and summary.get("status") in TERMINAL_EXECUTION_STATUSES
+
+    async def _read_command_summary(self, execution_id: str) -> BaseResult:
+        """
+        Read the commands summary of the execution. The summaries of the finished executions never change, they
+        are kept in an on-disk cache addressed by the cloud, the execution id and the request parameters.
+        """
         report_commands_url = perfecto.get_test_execution_commands_api_url(self.token.cloud_name) + "/"
 
         params = {
@@ -200,8 +844,71 @@ class ExecutionManager(Manager):
             "commandRequestType": "COMMAND_SUMMARY"
         }
 
-        return await api_request(self.token, "GET", endpoint=report_commands_url, params=params,
-                                 result_formatter_params={"cloud_name": self.token.cloud_name})
+        summary_cache = self._get_summary_cache()
+        cache_key = json.dumps([self.token.cloud_name, report_commands_url, params], sort_keys=True)
+        if summary_cache is not None:
+            summary = await asyncio.to_thread(summary_cache.get, cache_key)
+            if summary is not None:
+                return BaseResult(result=summary)
+
+        summary = await api_request(self.token, "GET", endpoint=report_commands_url, params=params,
+                                    result_formatter_params={"cloud_name": self.token.cloud_name})
+        if (summary_cache is not None and summary.error is None and summary.result
+                and self._is_terminal_execution(execution_id, summary.result)):
+            await asyncio.to_thread(summary_cache.put, cache_key, summary.result)
+        return summary
+
+    @token_verify
+    async def red_report_execution(self, execution_id: str, args: Optional[dict[str, Any]] = None) -> BaseResult:
+        """
+        Read the commands summary of the execution, only the page of commands matching the args filters is
+        formatted and returned unless args has raw.
+        """
+        if args is None:
+            args = {}
+        summary = await self._read_command_summary(execution_id)
+        if summary.error is None and not args.get("raw", False):
+            commands = format_command_summary(summary.result, args)
+            if commands is None:
+                summary.append_warnings(["The commands summary has no command list, it's returned unformatted."])
+            else:
+                summary.result = commands
+        return summary
+
+    @token_verify
+    async def read_report_executions(self, execution_ids: list[str],
+                                     args: Optional[dict[str, Any]] = None) -> BaseResult:
+        """
+        Read the details of several report executions concurrently (up to EXECUTION_READ_CONCURRENCY requests at
+        the same time). A failed execution is reported with its error without failing the others.
+        """
+        semaphore = asyncio.Semaphore(EXECUTION_READ_CONCURRENCY)
+
+        async def read_execution(execution_id: str) -> dict[str, Any]:
+            async with semaphore:
+                try:
+                    execution = await self.red_report_execution(execution_id, args)
+                except httpx.HTTPStatusError as e:
+                    return {"execution_id": execution_id, "error": f"HTTP error {e.response.status_code}"}
+                except httpx.HTTPError as e:
+                    return {"execution_id": execution_id, "error": f"HTTP error {type(e).__name__}: {e}"}
+            if execution.error is not None:
+                return {"execution_id": execution_id, "error": execution.error}
+            if execution.warning:
+                return {"execution_id": execution_id, "result": execution.result, "warning": execution.warning}
+            return {"execution_id": execution_id, "result": execution.result}
+
+        # Keep the order of the ids, reading each repeated id once
+        execution_ids = list(dict.fromkeys(execution_ids))
+        executions = await asyncio.gather(*[read_execution(execution_id) for execution_id in execution_ids])
+        failed = [execution["execution_id"] for execution in executions if "error" in execution]
+        warnings = None
+        if failed:
+            warnings = [f"Failed to read {len(failed)} of {len(executions)} executions: {', '.join(failed)}"]
+        return BaseResult(
+            result=executions,
+            warning=warnings,
+        )
 
 
 def register(mcp, token: Optional[PerfectoToken]):
@@ -211,6 +918,11 @@ def register(mcp, token: Optional[PerfectoToken]):
 Operations on execution information.
 Actions:
 - list_live_executions: List all live executions (Mobile, Tablet and Desktop Browser).
+- watch_live_executions: Wait in the server until the live executions finish, pushing only their changes (started, finished, status changed) 
+    as notifications, and return all the changes at the end.
+    args(dict): Dictionary with the following optional parameters:
+        execution_id_list (list[str]): The live execution IDs to watch, by default the executions running now and the ones started meanwhile.
+        timeout (int, default=300, max=3600): Maximum seconds to wait, the still running executions are returned when it expires.
 - stop_live_executions: Stop live executions.
     args(dict): Dictionary with the following required parameters:
         execution_id_list (list[str]): The execution Id to to be stopped.
@@ -234,20 +946,57 @@ Actions:
         os_version_list (list[str], values= use first list_filter_values tool with 'os_version_list'): The list of operating system versions to filter the execution results.
         failure_reason_list (list[str], values= use first list_filter_values tool with 'failure_reason_list'): The list of failure reason IDs to filter the execution results.
         page_index (int, default=1), The current page number. If the result mention has_next_page in true, asks the user if they want to see the next page. 
+        page_size (int, default=50, max=500): The number of executions of each page.
+        cursor (str): The cursor returned by the previous page, to read the next page (use the same filters, page_index is not needed).
+        all_pages (bool, default=False): Read all the pages from page_index in a single call, up to max_items executions.
+        max_items (int, default=1000): Maximum number of executions to read with all_pages (it also enables all_pages).
+        time_shard (str, default='auto', values['auto','day','hour','none']): Split the time frame in shards searched concurrently,
+            auto=split in days the time frames wider than one day when reading beyond the first 10000 executions, none=single search.
         
+- analyze_executions: Analyze the finished executions of a time frame in the server and return a compact summary: 
+    pass rate, statuses, flaky tests (status flips between consecutive runs of a test), rollups by job and duration percentiles.
+    args(dict): Dictionary with the same optional filter parameters of list_report_executions (except page_index and cursor), and:
+        max_items (int, default=1000): Maximum number of executions to analyze (the newest ones).
+        top (int, default=20): Maximum number of rows of the tests and jobs tables.
+
 - list_filter_values: List the values needed for list_report_executions filters
     args(dict): Dictionary with the following required filter parameters:
         filter_names (list[str], values=['device_id_list', 'os_list', 'platform_list', 'browser_list', 'job_name_list', 'trigger_list', 'tag_list', 'owner_list', 'os_version_list', 'failure_reason_list']): The filter name list.
-        
+    The filter values are cached for a few minutes.
+
+- invalidate_filter_values: Discard the cached filter values, use it when a recently created value (like a new tag or job) is missing.
+
+- sync_execution_store: Synchronize now the local execution store (only when enabled in the server configuration).
+    When enabled, list_report_executions and analyze_executions are answered from the local store (synchronized at most 
+    every minute) unless they use filters not kept locally (browser, trigger, owner or failure reason) or a time frame older than the store.
+    The store is filled in background (the first time, the last days kept locally), until then the API answers the searches.
+
 - read_report_execution: Read report execution details (commands summary)
-    args(dict): Dictionary with the following required filter parameters:
+    args(dict): Dictionary with one of the following parameters:
         execution_id (str): The report execution ID (obtained from list_report_executions).
+        execution_id_list (list[str]): Several report execution IDs, read concurrently in a single call.
+            The result has one entry by execution ID with its details or its own error.
+    args(dict): Dictionary with the following optional parameters to select the commands:
+        commands (str, default='all', values['all','failed','around_failure']): all=all the commands, failed=only the failed commands,
+            around_failure=the failed commands with the commands before and after each of them.
+        context (int, default=5): Number of commands before and after each failed command with around_failure.
+        command_name (str): Only the commands whose name contains this text (case-insensitive).
+        page_index (int, default=1): The current page of commands.
+        page_size (int, default=50, max=500): The number of commands of each page.
+        raw (bool, default=False): Return the full commands summary unformatted (it can be very large).
+    The commands are returned as a compact table (columns and rows) with the total of commands, failed commands and the first failed command index.
+    The commands summary of the finished executions is cached on disk, reading it again is immediate.
 
 Hints:
 - IMPORTANT: Always call list_filter_values first to get valid filter values before using any filters in list_report_executions. 
   This ensures you're using the correct device IDs, test names, or other filter values that actually exist in the execution reports system.
 - The device IDs from list_real_devices may not match the device IDs used in execution reports. Use list_filter_values to get the exact device IDs that are valid for filtering executions.
 - When filtering by device_id_list, time_frame, or test_name, always verify the valid values using list_filter_values to avoid empty results due to incorrect filter values.
+- To monitor running executions use watch_live_executions instead of calling list_live_executions repeatedly.
+- To triage several failed executions, use read_report_execution with execution_id_list instead of one call by execution.
+- To find why an execution failed, read it with commands='around_failure' before paging through all the commands.
+- Use analyze_executions for pass rate, flakiness or duration questions instead of listing the executions.
+- Prefer all_pages with a max_items over calling list_report_executions page by page when many executions are needed.
 - Always generates the url attributes as a link in markdown format (like execution_url). 
 """
     )
@@ -263,16 +1012,26 @@ Hints:
             match action:
                 case "list_live_executions":
                     return await execution_manager.list_live_executions()
+                case "watch_live_executions":
+                    return await execution_manager.watch_live_executions(args)
                 case "stop_live_executions":
                     return await execution_manager.stop_live_executions(args["execution_id_list"])
                 case "list_report_names":
                     return await execution_manager.list_report_names()
                 case "list_report_executions":
                     return await execution_manager.list_report_executions(args)
+                case "analyze_executions":
+                    return await execution_manager.analyze_executions(args)
                 case "list_filter_values":
                     return await execution_manager.list_filter_values(args.get("filter_names", []))
+                case "invalidate_filter_values":
+                    return await execution_manager.invalidate_filter_values()
+                case "sync_execution_store":
+                    return await execution_manager.sync_execution_store()
                 case "read_report_execution":
-                    return await execution_manager.red_report_execution(args.get("execution_id", ""))
+                    if "execution_id_list" in args:
+                        return await execution_manager.read_report_executions(args["execution_id_list"], args)
+                    return await execution_manager.red_report_execution(args.get("execution_id", ""), args)
                 case _:
                     return BaseResult(
                         error=f"Action {action} not found in execution manager tool"
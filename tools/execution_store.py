@@ -0,0 +1,239 @@
+"""
+Local SQLite store of the report executions, synchronized incrementally from the Perfecto reporting API.
+Several server processes can share the store: the database runs in WAL mode and waits for the locks.
+"""
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from models.execution import Execution
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS executions (
+    cloud TEXT NOT NULL,
+    id TEXT NOT NULL,
+    start_time INTEGER NOT NULL,
+    end_time INTEGER,
+    name TEXT,
+    status TEXT,
+    job_name TEXT,
+    job_number INTEGER,
+    data TEXT NOT NULL,
+    PRIMARY KEY (cloud, id)
+);
+CREATE INDEX IF NOT EXISTS executions_start_time ON executions (cloud, start_time DESC);
+CREATE INDEX IF NOT EXISTS executions_name ON executions (cloud, name);
+CREATE INDEX IF NOT EXISTS executions_status ON executions (cloud, status);
+CREATE INDEX IF NOT EXISTS executions_job ON executions (cloud, job_name, job_number);
+CREATE TABLE IF NOT EXISTS execution_tags (
+    cloud TEXT NOT NULL,
+    id TEXT NOT NULL,
+    tag TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS execution_tags_tag ON execution_tags (cloud, tag);
+CREATE INDEX IF NOT EXISTS execution_tags_id ON execution_tags (cloud, id);
+CREATE TABLE IF NOT EXISTS execution_platforms (
+    cloud TEXT NOT NULL,
+    id TEXT NOT NULL,
+    device_id TEXT,
+    platform_name TEXT,
+    os TEXT,
+    os_version TEXT
+);
+CREATE INDEX IF NOT EXISTS execution_platforms_device ON execution_platforms (cloud, device_id);
+CREATE INDEX IF NOT EXISTS execution_platforms_id ON execution_platforms (cloud, id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    cloud TEXT PRIMARY KEY,
+    coverage_start INTEGER NOT NULL,
+    complete_since INTEGER NOT NULL,
+    watermark INTEGER NOT NULL,
+    synced_at INTEGER NOT NULL
+);
+"""
+
+# Search body fields answered by the store: column filters and filters through the related tables
+COLUMN_FIELDS = {
+    "jobName": "job_name",
+    "jobNumber": "job_number",
+}
+TAG_FIELDS = {
+    "tags": "tag",
+}
+PLATFORM_FIELDS = {
+    "deviceId": "device_id",
+    "deviceType": "platform_name",
+    "os": "os",
+    "osVersion": "os_version",
+}
+TIME_FIELDS = ["startExecutionTime", "endExecutionTime"]
+
+
+class ExecutionStore:
+    """
+    SQLite store with the executions of each cloud, indexed by start time, name, status, job, tags and device.
+    The methods are blocking, call them from a worker thread.
+    """
+
+    def __init__(self, path: Path, busy_timeout: float = 30.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(sync_state)")]
+            if "complete_since" not in columns:
+                # Stores created before the backfill: everything since coverage_start was read
+                connection.execute("ALTER TABLE sync_state ADD COLUMN complete_since INTEGER NOT NULL DEFAULT 0")
+                connection.execute("UPDATE sync_state SET complete_since = coverage_start")
+            if connection.execute("PRAGMA user_version").fetchone()[0] < 1:
+                # Stores saved before the end time 0 (not finished) was stored as NULL
+                connection.execute("UPDATE executions SET end_time = NULL WHERE end_time = 0")
+                connection.execute("PRAGMA user_version = 1")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection by operation, so the store can be used from any thread
+        connection = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+        connection.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def get_sync_state(self, cloud: str) -> Optional[dict[str, int]]:
+        """
+        Sync state of the cloud: the executions are kept since coverage_start, all the executions started since
+        complete_since were read (older ones may be missing until the backfill reads them) and the newest stored
+        execution started at watermark.
+        """
+        with self._connect() as connection:
+            row = connection.execute("SELECT coverage_start, complete_since, watermark, synced_at FROM sync_state "
+                                     "WHERE cloud = ?", (cloud,)).fetchone()
+        if row is None:
+            return None
+        return {"coverage_start": row[0], "complete_since": row[1], "watermark": row[2], "synced_at": row[3]}
+
+    def get_oldest_running(self, cloud: str, terminal_statuses: list[str], since: int) -> Optional[int]:
+        """
+        Start time of the oldest stored execution started since the given time, without a terminal status and
+        without end time. None when all the stored executions started since then have finished.
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                f"SELECT MIN(start_time) FROM executions WHERE cloud = ? AND start_time >= ? AND end_time IS NULL "
+                f"AND (status IS NULL OR status NOT IN ({','.join('?' * len(terminal_statuses))}))",
+                [cloud, since, *terminal_statuses]
+            ).fetchone()
+        return row[0]
+
+    def save(self, cloud: str, executions: list[Execution], coverage_start: int, complete_since: int,
+             watermark: int):
+        """
+        Insert or replace the executions, drop the ones started before coverage_start (the retention) and update the
+        sync state in a single transaction. The watermark never goes back, when another process synchronized
+        further it's kept.
+        """
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            for table in ["execution_tags", "execution_platforms"]:
+                connection.execute(f"DELETE FROM {table} WHERE cloud = ? AND id IN "
+                                   f"(SELECT id FROM executions WHERE cloud = ? AND start_time < ?)",
+                                   (cloud, cloud, coverage_start))
+            connection.execute("DELETE FROM executions WHERE cloud = ? AND start_time < ?", (cloud, coverage_start))
+            ids = [(cloud, execution.test_id) for execution in executions]
+            connection.executemany("DELETE FROM execution_tags WHERE cloud = ? AND id = ?", ids)
+            connection.executemany("DELETE FROM execution_platforms WHERE cloud = ? AND id = ?", ids)
+            connection.executemany(
+                "INSERT OR REPLACE INTO executions "
+                "(cloud, id, start_time, end_time, name, status, job_name, job_number, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                # The API reports the end time of the executions not finished as missing or 0
+                [(cloud, execution.test_id, execution.start_timestamp, execution.end_timestamp or None,
+                  execution.test_name,
+                  execution.status, execution.job_name, execution.job_id, execution.model_dump_json())
+                 for execution in executions]
+            )
+            connection.executemany(
+                "INSERT INTO execution_tags (cloud, id, tag) VALUES (?, ?, ?)",
+                [(cloud, execution.test_id, tag) for execution in executions for tag in execution.tags]
+            )
+            connection.executemany(
+                "INSERT INTO execution_platforms (cloud, id, device_id, platform_name, os, os_version) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(cloud, execution.test_id, platform.device_id, platform.platform_name, platform.os,
+                  platform.os_version) for execution in executions for platform in execution.platforms]
+            )
+            connection.execute(
+                "INSERT INTO sync_state (cloud, coverage_start, complete_since, watermark, synced_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (cloud) DO UPDATE SET coverage_start = excluded.coverage_start, "
+                "complete_since = excluded.complete_since, watermark = MAX(watermark, excluded.watermark), "
+                "synced_at = excluded.synced_at",
+                (cloud, coverage_start, complete_since, watermark, int(time.time() * 1000))
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    @staticmethod
+    def supports(body: dict[str, Any]) -> bool:
+        """
+        Whether the search body only uses filters and sorting that the store can answer.
+        """
+        fields = body["filter"]["fields"]
+        supported = set(TIME_FIELDS) | set(COLUMN_FIELDS) | set(TAG_FIELDS) | set(PLATFORM_FIELDS)
+        return (all(field in supported for field in fields)
+                and not body["filter"].get("excludedFields")
+                and set(body["filter"].get("fieldNameToSearchFilter", {})) <= {"name"}
+                and body.get("sort") == [{"sortBy": "startTime", "sortOrder": "DESCEND"}])
+
+    def search(self, cloud: str, body: dict[str, Any], skip: int, page_size: int) -> tuple[list[Execution], int]:
+        """
+        Page of executions matching the search body (see supports) sorted by start time, and the total.
+        """
+        conditions = ["e.cloud = ?"]
+        params = [cloud]
+        fields = body["filter"]["fields"]
+        if fields.get("startExecutionTime"):
+            conditions.append("e.start_time >= ?")
+            params.append(fields["startExecutionTime"][0])
+        if fields.get("endExecutionTime"):
+            conditions.append("e.start_time <= ?")
+            params.append(fields["endExecutionTime"][0])
+        name_filter = body["filter"].get("fieldNameToSearchFilter", {}).get("name", {})
+        if name_filter.get("term"):
+            if name_filter.get("exact", False):
+                conditions.append("e.name = ?")
+                params.append(name_filter["term"])
+            else:
+                conditions.append("e.name LIKE ? ESCAPE '\\'")
+                term = name_filter["term"].replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                params.append(f"%{term}%")
+        for field, column in COLUMN_FIELDS.items():
+            if fields.get(field):
+                conditions.append(f"e.{column} IN ({','.join('?' * len(fields[field]))})")
+                params.extend(fields[field])
+        for table, table_fields in [("execution_tags", TAG_FIELDS), ("execution_platforms", PLATFORM_FIELDS)]:
+            for field, column in table_fields.items():
+                if fields.get(field):
+                    conditions.append(f"EXISTS (SELECT 1 FROM {table} t WHERE t.cloud = e.cloud AND t.id = e.id "
+                                      f"AND t.{column} IN ({','.join('?' * len(fields[field]))}))")
+                    params.extend(fields[field])
+        where = " AND ".join(conditions)
+
+        with self._connect() as connection:
+            total = connection.execute(f"SELECT COUNT(*) FROM executions e WHERE {where}", params).fetchone()[0]
+            rows = connection.execute(
+                f"SELECT e.data, e.start_time, e.end_time FROM executions e WHERE {where} "
+                f"ORDER BY e.start_time DESC, e.id LIMIT ? OFFSET ?",
+                params + [page_size, skip]
+            ).fetchall()
+        executions = [Execution.model_validate({**json.loads(data), "start_timestamp": start_time,
+                                                "end_timestamp": end_time})
+                      for data, start_time, end_time in rows]
+        return executions, total
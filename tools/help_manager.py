@@ -1,8 +1,14 @@
 import asyncio
+import gzip
+import hashlib
+import json
+import logging
 import traceback
 from copy import deepcopy
+from datetime import datetime, timezone
 from itertools import chain
-from typing import Optional, Any, Dict, List
+from pathlib import Path
+from typing import Optional, Any, Dict, List, Callable, Iterable
 
 import httpx
 from mcp.server.fastmcp import Context
@@ -10,26 +16,313 @@ from pydantic import Field
 
 from config.perfecto import TOOLS_PREFIX, SUPPORT_MESSAGE, get_real_devices_extended_commands_help_url, \
     get_real_devices_extended_command_base_help_url, HELP_INDEX_URL, HELP_TOC_URL, HELP_BASE_CONTENT_URL
+from config.settings import HELP_CONCURRENCY, HELP_PAGE_CACHE_SIZE
 from config.token import PerfectoToken
 from formatters.help import format_list_real_devices_extended_commands_info, \
     format_read_real_devices_extended_command_info, format_help_info
 from models.manager import Manager
 from models.result import BaseResult
+from tools.cache import LRUCache
+from tools.help_search import HelpSearchIndex
 from tools.help_utils import convert_js_to_py_dict
-from tools.utils import http_request
+from tools.utils import http_request, http_conditional_request, read_cache_file, write_cache_file, \
+    get_resources_path
+
+logger = logging.getLogger(__name__)
+
+HELP_TOC_CACHE_FILE = "help_toc.json"
+HELP_TOC_CACHE_VERSION = 1
+HELP_SEARCH_INDEX_CACHE_FILE = "help_search_index.json"
+HELP_SEARCH_INDEX_CACHE_VERSION = 2
+HELP_SEARCH_INDEX_SAVE_INTERVAL = 200  # Pages indexed between two saves of the search index while crawling
+HELP_SEARCH_INDEX_SAVE_DELAY = 10  # Seconds a save of the search index waits, to write several changes at once
+HELP_SNAPSHOT_FILE = "help_snapshot.json.gz"
+HELP_SNAPSHOT_VERSION = 3
 
 
 class HelpManager(Manager):
     help_tree = None  # Static to share between different instance of HelpManager
     help_items_index = {}
     help_index_nodes = {}
+    help_toc_validators = {}  # ETag/Last-Modified of each TOC file, used to revalidate the cached TOC
+    help_toc_lock = asyncio.Lock()
+    help_toc_revalidation = None
+    help_page_cache = LRUCache(max_bytes=HELP_PAGE_CACHE_SIZE)  # Converted help pages by URL and formatter
+    help_search_index = None  # Loaded on the first search
+    help_search_index_lock = asyncio.Lock()
+    help_search_index_save = None  # Pending save of the search index
+    help_search_crawl = None  # Background task indexing the bodies of the pages not read yet
+    help_snapshot = None  # TOC and search index bundled with the binaries, False when there is no snapshot
+    help_snapshot_lock = asyncio.Lock()
+    help_page_refreshes = set()  # Background revalidations of the pages served from the snapshot
 
     def __init__(self, token: Optional[PerfectoToken], ctx: Context):
         super().__init__(token, ctx)
 
     async def _load_help_tree(self):
+        async with HelpManager.help_toc_lock:
+            if HelpManager.help_tree is not None:
+                return
+            if HelpManager._load_cached_help_tree() or await HelpManager._load_snapshot_help_tree():
+                # Serve from the local cache or the snapshot and check in background if the help TOC has changed
+                HelpManager.help_toc_revalidation = asyncio.create_task(HelpManager._revalidate_help_tree())
+                return
+            await HelpManager._download_help_tree()
+
+    @staticmethod
+    def _load_cached_help_tree() -> bool:
+        return HelpManager._set_help_toc(read_cache_file(HELP_TOC_CACHE_FILE))
+
+    @staticmethod
+    async def _load_snapshot_help_tree() -> bool:
+        snapshot = await HelpManager._get_help_snapshot()
+        if snapshot is None or not HelpManager._set_help_toc(snapshot["toc"]):
+            return False
+        # Save it locally, the next processes don't need the snapshot
+        write_cache_file(HELP_TOC_CACHE_FILE, snapshot.pop("toc"))
+        return True
+
+    @staticmethod
+    def _set_help_toc(help_toc: Optional[dict]) -> bool:
+        if not help_toc or help_toc.get("version") != HELP_TOC_CACHE_VERSION:
+            return False
+        HelpManager._set_help_tree(help_toc["help_tree"], help_toc["help_items_index"],
+                                   dict(help_toc["help_index_nodes"]), help_toc["validators"])
+        return True
+
+    @staticmethod
+    def _get_help_toc() -> dict:
+        # The node ids aren't always strings, store the nodes as pairs to keep the original keys after the JSON trip
+        return {
+            "version": HELP_TOC_CACHE_VERSION,
+            "validators": HelpManager.help_toc_validators,
+            "help_tree": HelpManager.help_tree,
+            "help_items_index": HelpManager.help_items_index,
+            "help_index_nodes": list(HelpManager.help_index_nodes.items()),
+        }
+
+    @staticmethod
+    def _set_help_tree(help_tree: dict, help_items_index: dict, help_index_nodes: dict, validators: dict):
+        HelpManager.help_items_index = help_items_index
+        HelpManager.help_index_nodes = help_index_nodes
+        HelpManager.help_toc_validators = validators
+        HelpManager.help_tree = help_tree
+
+        # The search index isn't loaded until the first search, it takes the titles when it's loaded
+        if HelpManager.help_search_index is not None:
+            HelpManager.help_search_index.set_titles(HelpManager._get_help_titles())
+            HelpManager._schedule_help_search_index_save()
+
+    @staticmethod
+    def _get_help_titles() -> Iterable[tuple[str, str, str, str, str]]:
+        return (
+            (f"{category}:{subcategory}:{item['help_id']}", category, subcategory, item["help_id"], item["title"])
+            for category, subcategories in HelpManager.help_tree.items()
+            for subcategory, items in subcategories.items()
+            for item in items
+        )
+
+    @staticmethod
+    async def _load_help_search_index() -> HelpSearchIndex:
+        async with HelpManager.help_search_index_lock:
+            if HelpManager.help_search_index is None:
+                # Reading and parsing the index takes a while, keep it out of the event loop
+                search_index = await asyncio.to_thread(HelpManager._read_cached_help_search_index)
+                if search_index is None:
+                    # No local index yet, start from the snapshot one, only needed once
+                    snapshot = await HelpManager._get_help_snapshot()
+                    search_index_data = snapshot.pop("search_index", None) if snapshot is not None else None
+                    search_index = await asyncio.to_thread(HelpManager._create_help_search_index, search_index_data)
+                    search_index.dirty = True  # Save it locally, the next processes don't need the snapshot
+                HelpManager.help_search_index = search_index
+                HelpManager._schedule_help_search_index_save()
+        return HelpManager.help_search_index
+
+    @staticmethod
+    def _read_cached_help_search_index() -> Optional[HelpSearchIndex]:
+        cached_index = read_cache_file(HELP_SEARCH_INDEX_CACHE_FILE)
+        if not cached_index or cached_index.get("version") != HELP_SEARCH_INDEX_CACHE_VERSION:
+            return None
+        return HelpManager._create_help_search_index(cached_index["index"])
+
+    @staticmethod
+    def _create_help_search_index(search_index_data: Optional[dict]) -> HelpSearchIndex:
+        search_index = HelpSearchIndex.from_dict(search_index_data) if search_index_data else HelpSearchIndex()
+        search_index.set_titles(HelpManager._get_help_titles())
+        return search_index
+
+    @staticmethod
+    def _schedule_help_search_index_save():
+        if HelpManager.help_search_index_save is None or HelpManager.help_search_index_save.done():
+            HelpManager.help_search_index_save = asyncio.create_task(
+                HelpManager._save_help_search_index(HELP_SEARCH_INDEX_SAVE_DELAY))
+
+    @staticmethod
+    async def _save_help_search_index(delay: float = 0):
+        await asyncio.sleep(delay)
+        search_index = HelpManager.help_search_index
+        if search_index is None or not search_index.dirty:
+            return
+        # Only the copy is made in the event loop, the serialization runs in a worker thread
+        search_index_copy = search_index.copy()
+        search_index.dirty = False
+        if not await asyncio.to_thread(HelpManager._write_help_search_index, search_index_copy):
+            search_index.dirty = True
+
+    @staticmethod
+    def _write_help_search_index(search_index: HelpSearchIndex) -> bool:
+        return write_cache_file(HELP_SEARCH_INDEX_CACHE_FILE, {
+            "version": HELP_SEARCH_INDEX_CACHE_VERSION,
+            "index": search_index.to_dict(),
+        })
+
+    @staticmethod
+    async def _crawl_help_search_index(pages: Optional[dict[str, dict]] = None):
+        """
+        Index the bodies of the help pages that weren't read yet, saving the index from time to time.
+        When pages is given, the converted pages are also collected there by URL.
+        """
+        search_index = await HelpManager._load_help_search_index()
+        semaphore = asyncio.Semaphore(HELP_CONCURRENCY)
+
+        async def index_page(doc_id: str):
+            document = search_index.documents.get(doc_id)
+            if document is None:
+                return
+            help_url = HelpManager._get_help_url(document["category"], document["subcategory"], document["help_id"])
+            try:
+                async with semaphore:
+                    response = await http_conditional_request(help_url)
+                    if response.error is not None:
+                        return
+                    result = await asyncio.to_thread(format_help_info, response.result, {"base_url": help_url})
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:
+                    # Page listed in the TOC but not published, index it without body to not retry it
+                    search_index.set_body(doc_id, "")
+                return
+            except Exception:
+                logger.debug("Failed to index the help page %s", help_url, exc_info=True)
+                return
+            search_index.set_body(doc_id, result["help_content"])
+            if pages is not None:
+                pages[help_url] = {
+                    "etag": response.etag,
+                    "last_modified": response.last_modified,
+                    "content_hash": hashlib.sha256(response.result.encode("utf-8")).hexdigest(),
+                    "result": result,
+                }
+
+        try:
+            pending = search_index.pending_bodies()
+            for start in range(0, len(pending), HELP_SEARCH_INDEX_SAVE_INTERVAL):
+                await asyncio.gather(*[index_page(doc_id)
+                                       for doc_id in pending[start:start + HELP_SEARCH_INDEX_SAVE_INTERVAL]])
+                await HelpManager._save_help_search_index()
+        except Exception:
+            logger.debug("Failed to index the help pages", exc_info=True)
+
+    @staticmethod
+    async def _get_help_snapshot() -> Optional[dict]:
+        async with HelpManager.help_snapshot_lock:
+            if HelpManager.help_snapshot is None:
+                snapshot = await asyncio.to_thread(HelpManager._read_help_snapshot)
+                HelpManager.help_snapshot = False
+                if snapshot is not None:
+                    # Only the TOC and the search index are kept, the pages go to the page cache while they fit
+                    for help_url, page, page_size in snapshot.pop("pages"):
+                        cache_key = (help_url, format_help_info.__name__)
+                        if HelpManager.help_page_cache.size + page_size > HelpManager.help_page_cache.max_bytes:
+                            break
+                        if HelpManager.help_page_cache.peek(cache_key) is None:
+                            HelpManager.help_page_cache.put(cache_key, {**page, "snapshot": True}, page_size)
+                    HelpManager.help_snapshot = snapshot
+        return HelpManager.help_snapshot or None
+
+    @staticmethod
+    def _read_help_snapshot() -> Optional[dict]:
+        """
+        Read the snapshot in a worker thread: one JSON document by line (the header, the TOC, the search index and
+        then each page), so the event loop isn't blocked by the parsing of a single large document.
+        The pages are returned as (URL, page, size) in the order they were written.
+        """
+        snapshot_file = get_resources_path().joinpath(HELP_SNAPSHOT_FILE)
+        try:
+            with gzip.open(snapshot_file, "rt", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                if header.get("version") != HELP_SNAPSHOT_VERSION:
+                    return None
+                snapshot = {
+                    **header,
+                    "toc": json.loads(f.readline()),
+                    "search_index": json.loads(f.readline()),
+                    "pages": [],
+                }
+                for line in f:
+                    help_url, page = json.loads(line)
+                    snapshot["pages"].append((help_url, page, HelpManager._get_help_page_size(page)))
+            return snapshot
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            logger.debug("Failed to read the help snapshot %s", snapshot_file, exc_info=True)
+            return None
+
+    @staticmethod
+    async def create_help_snapshot(snapshot_path: Path) -> int:
+        """
+        Download the help TOC and every help page into a compressed snapshot to bundle with the binaries,
+        returns the number of pages in the snapshot.
+        """
+        HelpManager.help_search_index = HelpSearchIndex()
+        await HelpManager._download_help_tree()
+        pages = {}
+        await HelpManager._crawl_help_search_index(pages)
+        if HelpManager.help_search_index_save is not None:
+            HelpManager.help_search_index_save.cancel()
+
+        header = {
+            "version": HELP_SNAPSHOT_VERSION,
+            "created": datetime.now(timezone.utc).isoformat(),
+        }
+        documents = chain([header, HelpManager._get_help_toc(), HelpManager.help_search_index.to_dict()],
+                          pages.items())
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(snapshot_path, "wt", encoding="utf-8") as f:
+            for document in documents:
+                f.write(json.dumps(document, ensure_ascii=False, separators=(",", ":")) + "\n")
+        return len(pages)
+
+    @staticmethod
+    def _get_help_url(category_id: str, subcategory_id: str, help_id: str) -> str:
+        help_url = f"{HELP_BASE_CONTENT_URL}{category_id}/"
+        if subcategory_id != "self":
+            help_url += f"{subcategory_id}/"
+        return f"{help_url}{help_id}.htm"
+
+    @staticmethod
+    async def _revalidate_help_tree():
+        async def revalidate(url: str, validators: dict) -> bool:
+            response = await http_conditional_request(url, etag=validators.get("etag"),
+                                                      last_modified=validators.get("last_modified"))
+            return response.not_modified
+
+        try:
+            validators = HelpManager.help_toc_validators
+            results = await asyncio.gather(*[revalidate(url, url_validators)
+                                             for url, url_validators in validators.items()])
+            if len(results) == 0 or not all(results):
+                await HelpManager._download_help_tree()
+        except Exception:
+            logger.debug("Failed to revalidate the help TOC", exc_info=True)
+
+    @staticmethod
+    async def _download_help_tree():
         help_index_url = HELP_INDEX_URL
-        help_index_response = await http_request("GET", endpoint=help_index_url)
+        help_index_response = await http_conditional_request(help_index_url)
+        validators = {
+            help_index_url: {"etag": help_index_response.etag, "last_modified": help_index_response.last_modified}
+        }
 
         help_index_response.result = convert_js_to_py_dict(help_index_response.result)
 
@@ -65,7 +358,9 @@ class HelpManager(Manager):
             help_chunk_urls.append(help_chunk_url)
 
         async def fetch_chunk(chunk_url: str):
-            help_chunk_response = await http_request("GET", endpoint=chunk_url)
+            help_chunk_response = await http_conditional_request(chunk_url)
+            validators[chunk_url] = {"etag": help_chunk_response.etag,
+                                     "last_modified": help_chunk_response.last_modified}
             help_chunk_response.result = convert_js_to_py_dict(help_chunk_response.result)
             help_content = []
             for url, content in help_chunk_response.result.items():
@@ -85,6 +380,8 @@ class HelpManager(Manager):
         merged = list(chain.from_iterable(results))
 
         help_tree = {}
+        help_items_index = {}
+        help_index_nodes = {}
         for item in merged:
             tree_id = item.get("help_tree_id", 0)
             sections = item.get("help_id").split("/")
@@ -103,16 +400,90 @@ class HelpManager(Manager):
                 help_tree[category][subcategory] = []
             help_tree[category][subcategory].append(item)
 
-            HelpManager.help_items_index[f"{category}:{subcategory}:{new_id}"] = tree_id
+            help_items_index[f"{category}:{subcategory}:{new_id}"] = tree_id
 
-            if tree_id not in HelpManager.help_index_nodes:
-                HelpManager.help_index_nodes[tree_id] = {
+            if tree_id not in help_index_nodes:
+                help_index_nodes[tree_id] = {
                     "category": category,
                     "subcategory": subcategory,
                     "help_id": new_id,
                     "sub_nodes": help_tree_index_flat[tree_id]["n"]
                 }
-        HelpManager.help_tree = help_tree
+        HelpManager._set_help_tree(help_tree, help_items_index, help_index_nodes, validators)
+        write_cache_file(HELP_TOC_CACHE_FILE, HelpManager._get_help_toc())
+
+    @staticmethod
+    async def _read_help_page(help_url: str, result_formatter: Callable, use_snapshot: bool = True) -> BaseResult:
+        """
+        Read a help page converted with the result_formatter, reusing the cached conversion while the page
+        ETag or content hash doesn't change. Pages not cached yet are served from the help snapshot when possible.
+        """
+        cache_key = (help_url, result_formatter.__name__)
+        cached_page = HelpManager.help_page_cache.peek(cache_key)
+        if cached_page is None and use_snapshot and result_formatter is format_help_info:
+            # The first read seeds the page cache with the snapshot pages
+            await HelpManager._get_help_snapshot()
+            cached_page = HelpManager.help_page_cache.peek(cache_key)
+        if cached_page is not None and cached_page.get("snapshot") and use_snapshot:
+            # Serve the page bundled in the snapshot and check in background if it has changed
+            task = asyncio.create_task(
+                HelpManager._read_help_page(help_url, result_formatter, use_snapshot=False))
+            HelpManager.help_page_refreshes.add(task)
+            task.add_done_callback(HelpManager._help_page_refresh_done)
+            return BaseResult(
+                result=cached_page["result"]
+            )
+        response = await http_conditional_request(help_url,
+                                                  etag=cached_page["etag"] if cached_page else None,
+                                                  last_modified=cached_page["last_modified"] if cached_page else None)
+        if response.error is not None:
+            return response
+
+        # The cached page may be evicted while waiting for the response, the one that was validated is kept
+        page = cached_page
+        content_hash = None
+        if not response.not_modified:
+            content_hash = hashlib.sha256(response.result.encode("utf-8")).hexdigest()
+            if page is not None and page["content_hash"] != content_hash:
+                page = None
+        if page is None:
+            # The HTML conversion is CPU bound, keep it out of the event loop
+            result = await asyncio.to_thread(result_formatter, response.result, {"base_url": help_url})
+            page = {
+                "etag": response.etag,
+                "last_modified": response.last_modified,
+                "content_hash": content_hash,
+                "result": result,
+            }
+            HelpManager._put_help_page(cache_key, page)
+        elif page.get("snapshot") or HelpManager.help_page_cache.get(cache_key) is not page:
+            # Checked against the help site (no need to refresh it in background anymore), or evicted meanwhile
+            page = {key: value for key, value in page.items() if key != "snapshot"}
+            HelpManager._put_help_page(cache_key, page)
+        logger.debug("Help page cache stats: %s", HelpManager.help_page_cache.stats())
+        return BaseResult(
+            result=page["result"]
+        )
+
+    @staticmethod
+    def _get_cached_help_body(document: dict[str, Any]) -> Optional[str]:
+        help_url = HelpManager._get_help_url(document["category"], document["subcategory"], document["help_id"])
+        page = HelpManager.help_page_cache.peek((help_url, format_help_info.__name__))
+        return page["result"].get("help_content") if page is not None else None
+
+    @staticmethod
+    def _put_help_page(cache_key: tuple[str, str], page: dict):
+        HelpManager.help_page_cache.put(cache_key, page, HelpManager._get_help_page_size(page))
+
+    @staticmethod
+    def _get_help_page_size(page: dict) -> int:
+        return len(json.dumps(page["result"], ensure_ascii=False).encode("utf-8"))
+
+    @staticmethod
+    def _help_page_refresh_done(task: asyncio.Task):
+        HelpManager.help_page_refreshes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug("Failed to refresh the help page", exc_info=task.exception())
 
     async def list_help_categories(self) -> BaseResult:
         if HelpManager.help_tree is None:
@@ -148,27 +519,27 @@ class HelpManager(Manager):
     async def read_help_info(self, category_id: str, subcategory_id: str, help_id_list: List[str]) -> BaseResult:
         if HelpManager.help_tree is None:
             await self._load_help_tree()
-        results = []
         if subcategory_id == "":
             subcategory_id = "self"
-        for help_id in help_id_list:
+        semaphore = asyncio.Semaphore(HELP_CONCURRENCY)
 
-            help_base_url = HELP_BASE_CONTENT_URL
-            help_url = f"{help_base_url}{category_id}/"
-            if subcategory_id != "self":
-                help_url += f"{subcategory_id}/"
-            help_url += f"{help_id}.htm"
+        async def read_help_page(help_id: str) -> dict[str, Any]:
+            help_url = HelpManager._get_help_url(category_id, subcategory_id, help_id)
+            index_id = f"{category_id}:{subcategory_id}:{help_id}"
 
             help_object = {
                 "help_id": help_id,
             }
             try:
-                result = await http_request("GET", endpoint=help_url, result_formatter=format_help_info,
-                                            result_formatter_params={"base_url": help_url})
+                async with semaphore:
+                    result = await HelpManager._read_help_page(help_url, format_help_info)
+                # Until the first search the index isn't loaded, the crawl will index the page
+                if HelpManager.help_search_index is not None and HelpManager.help_search_index.set_body(
+                        index_id, result.result.get("help_content", "")):
+                    HelpManager._schedule_help_search_index_save()
 
                 # Expand or "Argument" the content ending with ""
                 if result.result.get("help_content", "").endswith("In this section:"):
-                    index_id = f"{category_id}:{subcategory_id}:{help_id}"
                     sub_nodes_items = []
                     if index_id in HelpManager.help_items_index:
                         node_id = HelpManager.help_items_index[index_id]
@@ -181,8 +552,10 @@ class HelpManager(Manager):
                 help_object["help_result"] = result.result
             except httpx.HTTPStatusError as e:
                 help_object["help_result"] = f"Error:{e.response.text}"
+            return help_object
 
-            results.append(help_object)
+        # gather keeps the results in the same order as help_id_list
+        results = await asyncio.gather(*[read_help_page(help_id) for help_id in help_id_list])
 
         return BaseResult(
             result={
@@ -192,6 +565,29 @@ class HelpManager(Manager):
             },
         )
 
+    async def search_help(self, query: str, max_results: int) -> BaseResult:
+        if HelpManager.help_tree is None:
+            await self._load_help_tree()
+        search_index = await HelpManager._load_help_search_index()
+        hits = search_index.search(query, max_results, get_body=HelpManager._get_cached_help_body)
+
+        info = []
+        pending = len(search_index.pending_bodies())
+        if pending > 0:
+            if HelpManager.help_search_crawl is None or HelpManager.help_search_crawl.done():
+                HelpManager.help_search_crawl = asyncio.create_task(HelpManager._crawl_help_search_index())
+            info.append(f"The content of {pending} of {len(search_index.documents)} help pages is being indexed, "
+                        f"meanwhile those pages are only matched by title")
+        if not hits:
+            info.append("No help page matches the query, try with other terms or browse the help categories")
+        return BaseResult(
+            result={
+                "query": query,
+                "hits": hits,
+            },
+            info=info or None
+        )
+
     async def list_real_devices_extended_commands(self) -> BaseResult:
         real_devices_extended_commands_help_url = get_real_devices_extended_commands_help_url()
         commands_result = await http_request("GET", endpoint=real_devices_extended_commands_help_url,
@@ -216,9 +612,8 @@ class HelpManager(Manager):
     async def read_real_devices_extended_command_info(command_id: str) -> BaseResult:
         real_devices_extended_command_help_url = get_real_devices_extended_command_base_help_url()
         real_devices_extended_command_help_url = f"{real_devices_extended_command_help_url}{command_id}.htm"
-        return await http_request("GET", endpoint=real_devices_extended_command_help_url,
-                                  result_formatter=format_read_real_devices_extended_command_info,
-                                  result_formatter_params={"base_url": real_devices_extended_command_help_url})
+        return await HelpManager._read_help_page(real_devices_extended_command_help_url,
+                                                 format_read_real_devices_extended_command_info)
 
 
 def register(mcp, token: Optional[PerfectoToken]):
@@ -237,11 +632,17 @@ Actions:
         category_id (str): The category id.
         subcategory_id (str): The sub-category id.
         help_id_list (List[str]): The help id list to read.
+- search_help: Full-text search over the help pages titles and content, ranked by relevance.
+    Returns the category_id, subcategory_id and help_id of each hit with a snippet, ready to use with read_help_info.
+    args(dict): Dictionary with the following parameters:
+        query (str): The words to search. Required.
+        max_results (int, default=10): Maximum number of hits to return.
 - list_real_devices_extended_commands: Perfecto provides support for extended RemoteWebDriver commands. You can use these commands as extensions to the default SDK. Perfecto extensions are also known as function references (FR).
 - read_real_devices_extended_command_info: Read the detailed command information.
     args(dict): Dictionary with the following required parameters:
         command_id (str): The command id.
 Hints:
+- Prefer search_help to find the relevant help pages before browsing the categories.
 - Always generates the url attributes as a link in markdown format (like command_url).
 """
     )
@@ -264,6 +665,8 @@ Hints:
                     return await help_manager.read_help_info(args.get("category_id", "home"),
                                                              args.get("subcategory_id", ""),
                                                              args.get("help_id_list", []))
+                case "search_help":
+                    return await help_manager.search_help(args["query"], args.get("max_results", 10))
                 case "list_real_devices_extended_commands":
                     return await help_manager.list_real_devices_extended_commands()
                 case "read_real_devices_extended_command_info":
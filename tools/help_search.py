@@ -0,0 +1,198 @@
+"""
+Full-text search over the Perfecto help pages.
+"""
+import hashlib
+import math
+import re
+from collections import Counter
+from heapq import nlargest
+from operator import itemgetter
+from typing import Any, Callable, Iterable, Optional
+
+TOKEN_PATTERN = re.compile(r"\w+")
+MARKDOWN_LINK_URL_PATTERN = re.compile(r"\]\([^)]*\)")
+STOP_WORDS = frozenset(["a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it",
+                        "of", "on", "or", "that", "the", "this", "to", "with", "you", "your"])
+TITLE_WEIGHT = 3  # A title term counts as this many body terms
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_SIZE = 240
+EXCERPT_SIZE = 4 * SNIPPET_SIZE  # Start of the body kept in the index, for the snippets of the pages not in memory
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def _title_terms(title: str) -> Counter:
+    return Counter(tokenize(title) * TITLE_WEIGHT)
+
+
+class HelpSearchIndex:
+    """
+    Inverted index of the help pages ranked with BM25. The titles come from the help TOC and the page bodies are
+    added as the pages are read, so the index can be built incrementally and persisted between sessions.
+    Only an excerpt of each body is kept, the terms of the body are in the postings.
+    """
+
+    def __init__(self, documents: Optional[dict[str, dict[str, Any]]] = None,
+                 postings: Optional[dict[str, dict[str, int]]] = None):
+        self.documents = documents if documents is not None else {}
+        self.postings = postings if postings is not None else {}
+        self.total_length = sum(document["length"] for document in self.documents.values())
+        self.dirty = False
+
+    def _index(self, doc_id: str, document: dict[str, Any], terms: Counter):
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = frequency
+        document["length"] = sum(terms.values())
+        self.documents[doc_id] = document
+        self.total_length += document["length"]
+        self.dirty = True
+
+    def _unindex(self, doc_id: str) -> Counter:
+        """
+        Remove a document from the index, returns its terms.
+        """
+        document = self.documents.pop(doc_id)
+        if document["body_hash"] is None:
+            # Only the title is indexed
+            candidates = _title_terms(document["title"])
+        else:
+            # The body isn't kept, look for the document in all the postings. Only done when a body changes
+            candidates = self.postings
+        terms = Counter()
+        for term in list(candidates):
+            term_postings = self.postings.get(term)
+            if term_postings is not None and doc_id in term_postings:
+                terms[term] = term_postings.pop(doc_id)
+                if not term_postings:
+                    del self.postings[term]
+        self.total_length -= document["length"]
+        self.dirty = True
+        return terms
+
+    def set_titles(self, pages: Iterable[tuple[str, str, str, str, str]]):
+        """
+        Synchronize the index with the (doc_id, category, subcategory, help_id, title) pages of the help TOC,
+        the bodies already indexed are kept while the page title doesn't change.
+        """
+        current = set()
+        for doc_id, category, subcategory, help_id, title in pages:
+            current.add(doc_id)
+            document = self.documents.get(doc_id)
+            terms = _title_terms(title)
+            if document is not None:
+                if document["title"] == title:
+                    continue
+                # Keep the body terms and replace the title ones
+                body_terms = self._unindex(doc_id)
+                body_terms.subtract(_title_terms(document["title"]))
+                terms.update(+body_terms)
+            self._index(doc_id, {
+                "category": category,
+                "subcategory": subcategory,
+                "help_id": help_id,
+                "title": title,
+                "excerpt": document["excerpt"] if document is not None else None,
+                "body_hash": document["body_hash"] if document is not None else None,
+            }, terms)
+        for doc_id in [doc_id for doc_id in self.documents if doc_id not in current]:
+            self._unindex(doc_id)
+
+    def set_body(self, doc_id: str, body: str) -> bool:
+        """
+        Index the converted body of a page, returns False when the page is unknown or its body didn't change.
+        """
+        document = self.documents.get(doc_id)
+        if document is None:
+            return False
+        body_hash = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        if document["body_hash"] == body_hash:
+            return False
+        self._unindex(doc_id)
+        terms = _title_terms(document["title"])
+        terms.update(tokenize(MARKDOWN_LINK_URL_PATTERN.sub("]", body)))
+        self._index(doc_id, {**document, "excerpt": body[:EXCERPT_SIZE], "body_hash": body_hash}, terms)
+        return True
+
+    def pending_bodies(self) -> list[str]:
+        return [doc_id for doc_id, document in self.documents.items() if document["body_hash"] is None]
+
+    def search(self, query: str, max_results: int,
+               get_body: Optional[Callable[[dict[str, Any]], Optional[str]]] = None) -> list[dict[str, Any]]:
+        """
+        Best matches of the query, get_body gives the full body of a document when it's at hand, to take the
+        snippet around the first match. Otherwise the snippet comes from the excerpt.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.documents:
+            return []
+        documents_count = len(self.documents)
+        average_length = self.total_length / documents_count or 1
+        scores = {}
+        for term in terms:
+            term_postings = self.postings.get(term)
+            if not term_postings:
+                continue
+            idf = math.log(1 + (documents_count - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+            for doc_id, frequency in term_postings.items():
+                length_norm = 1 - BM25_B + BM25_B * self.documents[doc_id]["length"] / average_length
+                score = idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * length_norm)
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+
+        terms_pattern = re.compile(r"\b(?:" + "|".join(map(re.escape, terms)) + r")\b", re.IGNORECASE)
+        hits = []
+        for doc_id, score in nlargest(max_results, scores.items(), key=itemgetter(1)):
+            document = self.documents[doc_id]
+            body = get_body(document) if get_body is not None else None
+            hits.append({
+                "category_id": document["category"],
+                "subcategory_id": document["subcategory"],
+                "help_id": document["help_id"],
+                "title": document["title"],
+                "score": round(score, 3),
+                "snippet": self._snippet(document, body or document["excerpt"], terms_pattern),
+            })
+        return hits
+
+    @staticmethod
+    def _snippet(document: dict[str, Any], body: Optional[str], terms_pattern: re.Pattern) -> str:
+        if not body:
+            return document["title"]
+        match = terms_pattern.search(body)
+        start = max(0, match.start() - SNIPPET_SIZE // 3) if match else 0
+        snippet = " ".join(body[start:start + SNIPPET_SIZE].split())
+        if start > 0:
+            snippet = "..." + snippet
+        if start + SNIPPET_SIZE < len(body):
+            snippet += "..."
+        return snippet
+
+    def copy(self) -> "HelpSearchIndex":
+        """
+        Copy that can be serialized in another thread while the index changes,
+        the documents are replaced and never modified once indexed.
+        """
+        return HelpSearchIndex(dict(self.documents),
+                               {term: dict(term_postings) for term, term_postings in self.postings.items()})
+
+    def to_dict(self) -> dict[str, Any]:
+        # The postings refer to the documents by position, as "position frequency position frequency..." strings.
+        # Much faster to parse than nested objects, json.loads holds the GIL for the whole document
+        positions = {doc_id: str(position) for position, doc_id in enumerate(self.documents)}
+        return {
+            "documents": self.documents,
+            "postings": {term: " ".join([value for doc_id, frequency in term_postings.items()
+                                         for value in (positions[doc_id], str(frequency))])
+                         for term, term_postings in self.postings.items()},
+        }
+
+    @staticmethod
+    def from_dict(data: dict[str, Any]) -> "HelpSearchIndex":
+        doc_ids = list(data["documents"])
+        postings = {}
+        for term, values in data["postings"].items():
+            values = list(map(int, values.split()))
+            postings[term] = dict(zip([doc_ids[position] for position in values[0::2]], values[1::2]))
+        return HelpSearchIndex(data["documents"], postings)
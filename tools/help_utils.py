@@ -1,9 +1,31 @@
 import json
 import re
+from json.encoder import encode_basestring
 from urllib.parse import urljoin
 
-import lxml.html
-
+from lxml import etree
+
+CODE_BLOCK_LANG = frozenset(['javascript', 'java', 'python', 'ruby', 'go', 'php', 'c#', 'csharp', 'typescript',
+                             'bash', 'shell', 'sql', 'json', 'xml', 'yaml', 'css', 'html'])
+HEADER_LEVELS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+INLINE_FORMATS = {'strong': ('b', '**'), 'b': ('b', '**'), 'em': ('i', '*'), 'i': ('i', '*'), 'code': ('code', '`')}
+INLINE_IGNORED_LINKS = frozenset(['copy', 'link', ''])
+IGNORED_TAGS = frozenset(['script', 'style', 'noscript', 'meta', 'link', 'head'])
+BLANK_LINES_PATTERN = re.compile(r'\n{3,}')
+
+# Tokens of the javascript help data rewritten to JSON, in a single scan: the single quoted strings without escapes
+# or double quotes (most of them), the bare keys, the other string literals, the comments, the trailing commas and
+# the AMD define() wrapper. The rest of the code is already JSON.
+JS_TOKEN_PATTERN = re.compile(r"'([^'\"\\\n]*)'"
+                              r'|([\w$]+)\s*:'
+                              r"|('[^'\\\n]*(?:\\[\s\S][^'\\\n]*)*'"
+                              r'|"[^"\\\n]*(?:\\[\s\S][^"\\\n]*)*")'
+                              r'|(//[^\n]*|/\*[\s\S]*?\*/)'
+                              r'|,(?=(?:\s|//[^\n]*|/\*[\s\S]*?\*/)*[}\]])'
+                              r'|\A\s*define\s*\(|\)\s*;?\s*\Z')
+JS_ESCAPE_PATTERN = re.compile(r'\\(x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|\r\n|[\s\S])')
+JS_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0',
+              '\n': '', '\r': '', '\r\n': '', '\u2028': '', '\u2029': ''}
 
 def clean_text(text, preserve_newlines=False):
     text = text.replace('\xa0', ' ')
@@ -17,15 +39,34 @@ def clean_text(text, preserve_newlines=False):
         return text.strip()
 
 
+def text_content(element):
+    return ''.join(element.itertext())
+
+
 def extract_text_with_br(element):
-    html_str = lxml.html.tostring(element, encoding='unicode', method='html')
-    html_str = html_str.replace('<br>', '\n').replace('<br/>', '\n').replace('<br />', '\n')
-    temp = lxml.html.fromstring(html_str)
-    return temp.text_content()
+    # Text content with the <br> elements as new lines, a tail with text is also part of the element text
+    out = []
+    _write_text_with_br(element, out)
+    if element.tail and element.tail.strip():
+        out.append(element.tail)
+    return ''.join(out)
+
+
+def _write_text_with_br(element, out):
+    if element.text:
+        out.append(element.text)
+    for child in element:
+        if isinstance(child.tag, str):  # Skip comments and processing instructions
+            if child.tag == 'br' and not child.attrib:
+                out.append('\n')
+            else:
+                _write_text_with_br(child, out)
+        if child.tail:
+            out.append(child.tail)
 
 
 def table_to_markdown(table, base_url=None, as_html=True):
-    rows = table.xpath('.//tr')
+    rows = list(table.iter('tr'))
     if not rows:
         return ""
 
@@ -34,27 +75,16 @@ def table_to_markdown(table, base_url=None, as_html=True):
     if as_html:
         markdown.append("<table>")
 
-    header_row = table.xpath('.//thead//tr[1] | .//tr[1]')
-    if header_row:
-        headers = []
-        for th in header_row[0].xpath('.//th | .//td'):
-            header_text = process_inline_elements(th, base_url, as_html)
-            header_text = clean_text(header_text)
-            headers.append(header_text)
-
-        if headers and any(h for h in headers if h):
-            if as_html:
-                header_html = ""
-                for header in headers:
-                    header_html += "<th>" + header + "</th>"
-                header_html = "<thead><tr>" + header_html + "</tr></thead>"
-                markdown.append(header_html)
-            else:
-                markdown.append("| " + " | ".join(headers) + " |")
-                markdown.append("| " + " | ".join(["---"] * len(headers)) + " |")
-            start_idx = 1
+    # The first row of the table is used as header when it has any text
+    headers = [clean_text(process_inline_elements(th, base_url, as_html)) for th in rows[0].iter('th', 'td')]
+    if any(headers):
+        if as_html:
+            markdown.append("<thead><tr>" + "".join(["<th>" + header + "</th>" for header in headers]) +
+                            "</tr></thead>")
         else:
-            start_idx = 0
+            markdown.append("| " + " | ".join(headers) + " |")
+            markdown.append("| " + " | ".join(["---"] * len(headers)) + " |")
+        start_idx = 1
     else:
         start_idx = 0
 
@@ -64,211 +94,181 @@ def table_to_markdown(table, base_url=None, as_html=True):
     for row in rows[start_idx:]:
         if as_html:
             markdown.append("<tr>")
-        cells = row.xpath('.//td | .//th')
-        if cells:
-            cell_texts = []
-            for cell in cells:
-                cell_text = process_inline_elements(cell, base_url, as_html)
-                cell_text = clean_text(cell_text)
-                cell_texts.append(cell_text)
-
-            if any(cell_texts):
-                if as_html:
-                    cells_html = ""
-                    for cell in cell_texts:
-                        cells_html += "<td>" + cell.replace("\n", "<br>") + "</td>"
-                    markdown.append(cells_html)
-                else:
-                    markdown.append("| " + " | ".join(cell_texts) + " |")
+        cell_texts = [clean_text(process_inline_elements(cell, base_url, as_html)) for cell in row.iter('td', 'th')]
+        if any(cell_texts):
+            if as_html:
+                markdown.append("".join(["<td>" + cell.replace("\n", "<br>") + "</td>" for cell in cell_texts]))
+            else:
+                markdown.append("| " + " | ".join(cell_texts) + " |")
         if as_html:
             markdown.append("</tr>")
 
     if as_html:
         markdown.append("</tbody></table>")
 
-    return "\n".join(markdown) if markdown else ""
+    return "\n".join(markdown)
 
 
 def process_inline_elements(element, base_url=None, as_html=False):
-    parts = []
+    out = []
+    _write_inline_elements(element, base_url, as_html, out)
+    return ''.join(out)
+
 
+def _write_inline_elements(element, base_url, as_html, out):
     if element.text:
-        parts.append(element.text)
+        out.append(element.text)
 
     for child in element:
+        if not isinstance(child.tag, str):  # Skip comments and processing instructions
+            if child.tail:
+                out.append(child.tail)
+            continue
+
         tag = child.tag.lower()
 
         if tag == 'a':
             href = child.get('href', '')
-            text = child.text_content().strip()
+            text = text_content(child).strip()
 
             if href and base_url:
                 href = urljoin(base_url, href)
 
-            if text.lower() in ['copy', 'link', ''] or 'javascript:' in href:
+            if text.lower() in INLINE_IGNORED_LINKS or 'javascript:' in href:
                 if child.tail:
-                    parts.append(child.tail)
+                    out.append(child.tail)
                 continue
 
-            if text and href:
+            if href:
                 if as_html:
-                    parts.append(f"<a href='{{href}}'>{text}</a>")
+                    out.append(f"<a href='{{href}}'>{text}</a>")
                 else:
-                    parts.append(f"[{text}]({href})")
-            elif text:
-                parts.append(text)
+                    out.append(f"[{text}]({href})")
+            else:
+                out.append(text)
 
         elif tag == 'br':
-            if as_html:
-                parts.append('<br>')
-            else:
-                parts.append('\n')
-        elif tag in ['strong', 'b']:
-            text = child.text_content().strip()
-            if text:
-                if as_html:
-                    parts.append(f"<b>{text}</b>")
-                else:
-                    parts.append(f"**{text}**")
-        elif tag in ['em', 'i']:
-            text = child.text_content().strip()
+            out.append('<br>' if as_html else '\n')
+        elif tag in INLINE_FORMATS:
+            text = text_content(child).strip()
             if text:
+                html_tag, markdown_mark = INLINE_FORMATS[tag]
                 if as_html:
-                    parts.append(f"<i>{text}</i>")
+                    out.append(f"<{html_tag}>{text}</{html_tag}>")
                 else:
-                    parts.append(f"*{text}*")
-        elif tag == 'code':
-            text = child.text_content().strip()
-            if text:
-                if as_html:
-                    parts.append(f"<code>{text}</code>")
-                else:
-                    parts.append(f"`{text}`")
+                    out.append(f"{markdown_mark}{text}{markdown_mark}")
         else:
-            inner_result = process_inline_elements(child, base_url)
-            if inner_result:
-                parts.append(inner_result)
+            _write_inline_elements(child, base_url, False, out)
 
         if child.tail:
-            parts.append(child.tail)
-
-    return ''.join(parts)
+            out.append(child.tail)
 
 
 def element_to_markdown(element, base_url=None, level=0):
-    code_block_lang = ['javascript', 'java', 'python', 'ruby', 'go', 'php', 'c#', 'csharp', 'typescript',
-                       'bash', 'shell', 'sql', 'json', 'xml', 'yaml', 'css', 'html']
+    out = []
+    _write_element(element, base_url, out)
+    return out
+
 
+def _write_element(element, base_url, out):
     tag = element.tag.lower()
-    result = []
 
     # Headers
-    if tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-        level_num = int(tag[1])
-        text = clean_text(element.text_content())
+    if tag in HEADER_LEVELS:
+        text = clean_text(text_content(element))
         if text:
-            result.append(f"{'#' * level_num} {text}\n")
+            out.append(f"{'#' * HEADER_LEVELS[tag]} {text}\n")
 
     elif tag == 'p':
         text = clean_text(process_inline_elements(element, base_url))
         if text:
-            result.append(f"{text}\n")
+            out.append(f"{text}\n")
 
     elif tag == 'ul':
-        for li in element.xpath('./li'):
+        for li in element.iterchildren('li'):
             text = clean_text(process_inline_elements(li, base_url))
             if text:
-                result.append(f"- {text}\n")
-        result.append("")
+                out.append(f"- {text}\n")
 
     elif tag == 'ol':
-        for i, li in enumerate(element.xpath('./li'), 1):
+        for i, li in enumerate(element.iterchildren('li'), 1):
             text = clean_text(process_inline_elements(li, base_url))
             if text:
-                result.append(f"{i}. {text}\n")
-        result.append("")
+                out.append(f"{i}. {text}\n")
 
     elif tag == 'table':
         table_md = table_to_markdown(element, base_url)
         if table_md:
-            result.append(f"{table_md}\n")
+            out.append(f"{table_md}\n")
 
     elif tag == 'pre' or 'codesnippet' in element.get('class', '').lower():
         lang = ""
         code_element = element
 
         # Try to get the language code and the source code
-
-        lang_elem = element.xpath('.//*[contains(@class, "language")]')
-        if not lang_elem:
+        has_lang_elem = any('language' in descendant.get('class', '')
+                            for descendant in element.iterdescendants(etree.Element))
+        if not has_lang_elem:
             for child in element:
-                child_text = child.text_content().strip().lower()
-                if child_text in code_block_lang:
+                if not isinstance(child.tag, str):
+                    continue
+                child_text = text_content(child).strip().lower()
+                if child_text in CODE_BLOCK_LANG:
                     lang = child_text
                     break
 
-        code_children = element.xpath('.//code')
-        if code_children:
-            code_element = code_children[0]
+        code_child = next(element.iterdescendants('code'), None)
+        if code_child is not None:
+            code_element = code_child
             class_attr = code_element.get('class', '')
             if 'language-' in class_attr:
                 lang = class_attr.split('language-')[1].split()[0]
 
-        code_text = extract_text_with_br(code_element)
-        code_text = clean_text(code_text, preserve_newlines=True)
+        code_text = clean_text(extract_text_with_br(code_element), preserve_newlines=True)
 
-        lines = code_text.split('\n')
         filtered_lines = []
-
-        for i, line in enumerate(lines):
+        for line in code_text.split('\n'):
             line_stripped = line.strip().lower()
             if line_stripped == 'copy':  # Exclude Copy element (UI Element)
                 continue
-            if line_stripped in code_block_lang:
+            if line_stripped in CODE_BLOCK_LANG:
                 lang = line_stripped
-
             filtered_lines.append(line)
 
         code_text = '\n'.join(filtered_lines).strip()
 
         if code_text:
-            result.append(f"```{lang}\n{code_text}\n```\n")
+            out.append(f"```{lang}\n{code_text}\n```\n")
 
     elif tag == 'blockquote':
-        text = extract_text_with_br(element)
-        text = clean_text(text)
+        # clean_text joins all the lines, the quote is always a single line
+        text = clean_text(extract_text_with_br(element))
         if text:
-            for line in text.split('\n'):
-                if line.strip():
-                    result.append(f"> {line}\n")
-            result.append("")
+            out.append(f"> {text}\n")
 
     elif tag == 'hr':
-        result.append("---\n")
+        out.append("---\n")
 
     elif tag == 'img':
         alt = element.get('alt', '')
         src = element.get('src', '')
         if src and base_url:
             src = urljoin(base_url, src)
-            result.append(f"![{alt}]({src})\n")
+            out.append(f"![{alt}]({src})\n")
 
-    elif tag in ['script', 'style', 'noscript', 'meta', 'link', 'head']:
-        # Ignore
+    elif tag in IGNORED_TAGS:
         pass
 
     # For any others elements, process the children
     else:
         for child in element:
-            child_md = element_to_markdown(child, base_url, level + 1)
-            if child_md:
-                result.extend(child_md)
-
-    return result
+            if isinstance(child.tag, str):  # Skip comments and processing instructions
+                _write_element(child, base_url, out)
 
 
 def html_to_markdown(html_content, base_url=None):
-    tree = lxml.html.fromstring(html_content)
+    # Plain lxml elements, the lxml.html element classes lookup is expensive on large pages
+    tree = etree.HTML(html_content)
 
     main_div = tree.xpath('//div[@role="main"]')
     if not main_div:
@@ -279,25 +279,38 @@ def html_to_markdown(html_content, base_url=None):
 
     main_div = main_div[0]
 
-    markdown_lines = []
+    # All the elements are written into a single buffer
+    out = []
     for child in main_div:
-        result = element_to_markdown(child, base_url)
-        if result:
-            markdown_lines.extend(result)
-
-    markdown = "".join(markdown_lines)
+        if isinstance(child.tag, str):  # Skip comments and processing instructions
+            _write_element(child, base_url, out)
 
-    while "\n\n\n" in markdown:
-        markdown = markdown.replace("\n\n\n", "\n\n")
+    markdown = BLANK_LINES_PATTERN.sub("\n\n", "".join(out))
 
     return markdown.strip()
 
 
+def _unescape_js(match):
+    escape = match.group(1)
+    if len(escape) > 1 and escape[0] in 'xu':
+        return chr(int(escape[1:], 16))
+    return JS_ESCAPES.get(escape, escape)
+
+
+def _js_token_to_json(match):
+    token = match.lastindex
+    if token == 1:
+        return '"' + match[1] + '"'
+    if token == 2:
+        return '"' + match[2] + '":'
+    if token == 3:
+        return encode_basestring(JS_ESCAPE_PATTERN.sub(_unescape_js, match[3][1:-1]))
+    if token == 4:  # Comment
+        return ' '
+    return ''
+
+
 def convert_js_to_py_dict(js_text: str) -> dict:
-    # Convert javascript dictionary to python dictionary
-    js_text = js_text.replace("define(", "").replace(");", "").replace("'", '"')
-    js_text = re.sub(r'//.*', '', js_text)
-    js_text = re.sub(r'/\*[\s\S]*?\*/', '', js_text)
-    js_text = re.sub(r',\s*(?=[}\]])', '', js_text)
-    js_text = re.sub(r'([{\[,]\s*)([A-Za-z_][A-Za-z0-9_]*)\s*:', r'\1"\2":', js_text)
-    return json.loads(js_text)
+    # Convert javascript dictionary (object literal wrapped in define(...)) to python dictionary.
+    # A single scan rewrites the javascript tokens to JSON, the content of the string literals is never rewritten.
+    return json.loads(JS_TOKEN_PATTERN.sub(_js_token_to_json, js_text), strict=False)
@@ -2,19 +2,27 @@
 Simple utilities for Perfecto MCP tools.
 """
 import base64
+import json
+import logging
 import os
 import platform
 import sys
+import tempfile
 from datetime import datetime
 from importlib import resources
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Optional, Callable, Any
 
 import httpx
 
+from config.perfecto import CACHE_DIR_ENV_NAME
+from config.settings import HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS, HTTP_KEEPALIVE_EXPIRY, \
+    POLL_MIN_INTERVAL, POLL_MAX_INTERVAL
 from config.token import PerfectoToken
 from config.version import __version__
-from models.result import BaseResult
+from models.result import BaseResult, ConditionalResult
+
+logger = logging.getLogger(__name__)
 
 so = platform.system()  # "Windows", "Linux", "Darwin"
 version = platform.version()  # kernel / build version
@@ -29,6 +37,42 @@ timeout = httpx.Timeout(
     write=15.0,
     pool=60.0
 )
+limits = httpx.Limits(
+    max_connections=HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+POLL_BACKOFF_FACTOR = 1.5
+
+# One long-lived client (connection pool) per host, shared by all the tools during the process lifetime
+http_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def get_http_client(endpoint: str) -> httpx.AsyncClient:
+    """
+    Return the pooled client for the endpoint host, creating it on first use.
+    Reusing the client keeps the TCP/TLS connection alive and multiplexes requests over HTTP/2.
+    """
+    url = httpx.URL(endpoint)
+    host = f"{url.scheme}://{url.netloc.decode('ascii')}"
+    client = http_clients.get(host)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(base_url="", http2=True, timeout=timeout, limits=limits)
+        http_clients[host] = client
+    return client
+
+
+async def close_http_clients():
+    """
+    Close all the pooled clients, used when the MCP server shuts down.
+    """
+    clients = list(http_clients.values())
+    http_clients.clear()
+    for client in clients:
+        await client.aclose()
 
 
 async def api_request(token: Optional[PerfectoToken], method: str, endpoint: str,
@@ -48,27 +92,27 @@ async def api_request(token: Optional[PerfectoToken], method: str, endpoint: str
     headers["Perfecto-Authorization"] = token.token
     headers["User-Agent"] = user_agent
 
-    async with (httpx.AsyncClient(base_url="", http2=True, timeout=timeout) as client):
-        try:
-            resp = await client.request(method, endpoint, headers=headers, **kwargs)
-            resp.raise_for_status()
-            result = resp.json()
-            error = None
-            if isinstance(result, list) and len(result) > 0 and "userMessage" in result[0]:  # It's an error
-                final_result = None
-                error = result[0].get("userMessage", None)
-            else:
-                final_result = result_formatter(result, result_formatter_params) if result_formatter else result
+    client = get_http_client(endpoint)
+    try:
+        resp = await client.request(method, endpoint, headers=headers, **kwargs)
+        resp.raise_for_status()
+        result = resp.json()
+        error = None
+        if isinstance(result, list) and len(result) > 0 and "userMessage" in result[0]:  # It's an error
+            final_result = None
+            error = result[0].get("userMessage", None)
+        else:
+            final_result = result_formatter(result, result_formatter_params) if result_formatter else result
+        return BaseResult(
+            result=final_result,
+            error=error,
+        )
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code in [401, 403]:
             return BaseResult(
-                result=final_result,
-                error=error,
+                error="Invalid credentials"
             )
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code in [401, 403]:
-                return BaseResult(
-                    error="Invalid credentials"
-                )
-            raise
+        raise
 
 
 async def http_request(method: str, endpoint: str,
@@ -82,23 +126,64 @@ async def http_request(method: str, endpoint: str,
     headers = kwargs.pop("headers", {})
     headers["User-Agent"] = user_agent
 
-    async with (httpx.AsyncClient(base_url="", http2=True, timeout=timeout) as client):
-        try:
-            resp = await client.request(method, endpoint, headers=headers, **kwargs)
-            resp.raise_for_status()
-            result = resp.text
-            error = None
-            final_result = result_formatter(result, result_formatter_params) if result_formatter else result
+    client = get_http_client(endpoint)
+    try:
+        resp = await client.request(method, endpoint, headers=headers, **kwargs)
+        resp.raise_for_status()
+        result = resp.text
+        error = None
+        final_result = result_formatter(result, result_formatter_params) if result_formatter else result
+        return BaseResult(
+            result=final_result,
+            error=error,
+        )
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code in [401, 403]:
             return BaseResult(
-                result=final_result,
-                error=error,
+                error="Invalid credentials"
             )
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code in [401, 403]:
-                return BaseResult(
-                    error="Invalid credentials"
-                )
-            raise
+        raise
+
+
+async def http_conditional_request(endpoint: str, etag: Optional[str] = None, last_modified: Optional[str] = None,
+                                   result_formatter: Callable = None,
+                                   result_formatter_params: Optional[dict] = None,
+                                   **kwargs) -> ConditionalResult:
+    """
+    Make a conditional GET request to the Perfecto Webpage using ETag/Last-Modified validators.
+    When the resource did not change the result is empty and not_modified is true.
+    """
+
+    headers = kwargs.pop("headers", {})
+    headers["User-Agent"] = user_agent
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    client = get_http_client(endpoint)
+    try:
+        resp = await client.request("GET", endpoint, headers=headers, **kwargs)
+        if resp.status_code == 304:
+            return ConditionalResult(
+                not_modified=True,
+                etag=etag,
+                last_modified=last_modified,
+            )
+        resp.raise_for_status()
+        result = resp.text
+        final_result = result_formatter(result, result_formatter_params) if result_formatter else result
+        return ConditionalResult(
+            result=final_result,
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+        )
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code in [401, 403]:
+            return ConditionalResult(
+                error="Invalid credentials"
+            )
+        raise
 
 
 def get_date_time_iso(timestamp: int) -> Optional[str]:
@@ -108,6 +193,36 @@ def get_date_time_iso(timestamp: int) -> Optional[str]:
         return datetime.fromtimestamp(timestamp).isoformat()
 
 
+def get_page_size(args: dict[str, Any], default: int = DEFAULT_PAGE_SIZE) -> int:
+    """
+    Page size requested in the tool args, limited to MAX_PAGE_SIZE.
+    """
+    try:
+        page_size = int(args.get("page_size", default))
+    except (TypeError, ValueError):
+        return default
+    return min(max(1, page_size), MAX_PAGE_SIZE)
+
+
+def encode_cursor(data: dict[str, Any]) -> str:
+    """
+    Opaque pagination cursor with the sort key of the last item returned.
+    """
+    cursor = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(cursor).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[dict[str, Any]]:
+    """
+    Data of a cursor created with encode_cursor, None when the cursor isn't valid.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (TypeError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
 def get_resources_path():
     try:
         resources_path = resources.files("resources")
@@ -126,3 +241,63 @@ def get_mcp_icon_uri():
     icon_path = get_resources_path().joinpath(name)
     icon_data = base64.standard_b64encode(icon_path.read_bytes()).decode()
     return f"data:image/png;base64,{icon_data}"
+
+
+def get_cache_path() -> Path:
+    cache_dir = os.getenv(CACHE_DIR_ENV_NAME)
+    if cache_dir:
+        return Path(cache_dir)
+    if sys.platform == "win32":
+        base_path = os.getenv("LOCALAPPDATA") or os.path.expanduser("~")
+        return Path(base_path) / "perfecto-mcp" / "cache"
+    elif sys.platform == "darwin":
+        return Path(os.path.expanduser("~")) / "Library" / "Caches" / "perfecto-mcp"
+    else:
+        base_path = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        return Path(base_path) / "perfecto-mcp"
+
+
+def read_cache_file(name: str) -> Optional[Any]:
+    """
+    Read a JSON document from the local cache directory, None when it doesn't exist or can't be read.
+    """
+    cache_file = get_cache_path() / name
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        logger.debug("Failed to read cache file %s", cache_file, exc_info=True)
+        return None
+
+
+def write_cache_file(name: str, data: Any) -> bool:
+    """
+    Write a JSON document to the local cache directory.
+    The file is replaced atomically, so other server processes never read a partial document.
+    """
+    cache_file = get_cache_path() / name
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_file = tempfile.mkstemp(prefix=f"{cache_file.name}.", suffix=".tmp", dir=cache_file.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_file, cache_file)
+        except BaseException:
+            os.unlink(temp_file)
+            raise
+        return True
+    except OSError:
+        logger.debug("Failed to write cache file %s", cache_file, exc_info=True)
+        return False
+
+
+def get_next_poll_interval(interval: Optional[float], changed: bool) -> float:
+    """
+    Adaptive polling: back to the minimum interval after a change, otherwise grow it up to the maximum.
+    """
+    if interval is None or changed:
+        return POLL_MIN_INTERVAL
+    return min(interval * POLL_BACKOFF_FACTOR, POLL_MAX_INTERVAL)